@@ -1,35 +1,52 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import math
-from scipy.stats import norm
-import matplotlib.pyplot as plt
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import numpy as np
 import sys
 
+# the quant package lives in the repository root, one level above this script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from quant.special_functions import norm_cdf as N, norm_pdf as n
+from quant.black_scholes import BS_chain
+from quant.bsm import check_dtype, standard_normal
+from quant.running_stats import RunningStats
+
 # Black-Scholes pricing model for European call and put options
 def black_scholes(S, K, T, r, sigma):
     d1 = (math.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * math.sqrt(T))
     d2 = d1 - sigma * math.sqrt(T)
     
-    call_price = S * norm.cdf(d1) - K * math.exp(-r * T) * norm.cdf(d2)
-    put_price = K * math.exp(-r * T) * norm.cdf(-d2) - S * norm.cdf(-d1)
+    call_price = S * N(d1) - K * math.exp(-r * T) * N(d2)
+    put_price = K * math.exp(-r * T) * N(-d2) - S * N(-d1)
     
     return call_price, put_price
 
-# Calculate the Greeks for digital options
+# Calculate the Greeks for digital (cash-or-nothing, unit payout) options
 def digital_greeks(S, K, T, r, sigma, option_type='call'):
-    d2 = (math.log(S / K) - (r - 0.5 * sigma ** 2) * T) / (sigma * math.sqrt(T))
+    d1 = (math.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * math.sqrt(T))
+    d2 = d1 - sigma * math.sqrt(T)
+    discount = math.exp(-r * T)
     
-    delta = norm.pdf(d2) / (S * sigma * math.sqrt(T))
-    vega = S * norm.pdf(d2) * math.sqrt(T)
-    gamma = -norm.pdf(d2) * (d2 / (S**2 * sigma**2 * T))
-    theta = -S * norm.pdf(d2) * sigma / (2 * math.sqrt(T))
-    rho = -T * math.exp(-r * T) * norm.pdf(d2)
+    # Greeks of the digital call
+    delta = discount * n(d2) / (S * sigma * math.sqrt(T))
+    vega = -discount * n(d2) * d1 / sigma
+    gamma = -discount * n(d2) * d1 / (S**2 * sigma**2 * T)
+    theta = r * discount * N(d2) - discount * n(d2) * ((r - 0.5 * sigma ** 2) / (sigma * math.sqrt(T)) - d2 / (2 * T))
+    rho = -T * discount * N(d2) + discount * n(d2) * math.sqrt(T) / sigma
     
+    # the digital put is a zero-coupon bond minus the digital call
     if option_type == 'put':
         delta = -delta
-        rho = -rho
+        vega = -vega
+        gamma = -gamma
+        theta = r * discount - theta
+        rho = -T * discount - rho
     
     return delta, vega, gamma, theta, rho
 
@@ -38,20 +55,20 @@ def greeks(S, K, T, r, sigma, option_type='call'):
     d1 = (math.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * math.sqrt(T))
     d2 = d1 - sigma * math.sqrt(T)
     
-    delta_call = norm.cdf(d1)
-    delta_put = norm.cdf(d1) - 1
+    delta_call = N(d1)
+    delta_put = N(d1) - 1
     
-    vega = S * norm.pdf(d1) * math.sqrt(T)
+    vega = S * n(d1) * math.sqrt(T)
     
-    gamma = norm.pdf(d1) / (S * sigma * math.sqrt(T))
+    gamma = n(d1) / (S * sigma * math.sqrt(T))
     
-    theta_call = (-S * norm.pdf(d1) * sigma / (2 * math.sqrt(T)) 
-                  - r * K * math.exp(-r * T) * norm.cdf(d2))
-    theta_put = (-S * norm.pdf(d1) * sigma / (2 * math.sqrt(T)) 
-                 + r * K * math.exp(-r * T) * norm.cdf(-d2))
+    theta_call = (-S * n(d1) * sigma / (2 * math.sqrt(T)) 
+                  - r * K * math.exp(-r * T) * N(d2))
+    theta_put = (-S * n(d1) * sigma / (2 * math.sqrt(T)) 
+                 + r * K * math.exp(-r * T) * N(-d2))
     
-    rho_call = K * T * math.exp(-r * T) * norm.cdf(d2)
-    rho_put = -K * T * math.exp(-r * T) * norm.cdf(-d2)
+    rho_call = K * T * math.exp(-r * T) * N(d2)
+    rho_put = -K * T * math.exp(-r * T) * N(-d2)
     
     if option_type == 'call':
         delta = delta_call
@@ -68,95 +85,174 @@ def greeks(S, K, T, r, sigma, option_type='call'):
 
 # Pricing model for digital options
 def digital_option(S, K, T, r, sigma, option_type='call'):
-    d2 = (math.log(S / K) - (r - 0.5 * sigma ** 2) * T) / (sigma * math.sqrt(T))
+    d2 = (math.log(S / K) + (r - 0.5 * sigma ** 2) * T) / (sigma * math.sqrt(T))
     if option_type == 'call':
-        price = math.exp(-r * T) * norm.cdf(d2)
+        price = math.exp(-r * T) * N(d2)
     elif option_type == 'put':
-        price = math.exp(-r * T) * norm.cdf(-d2)
+        price = math.exp(-r * T) * N(-d2)
     else:
         raise ValueError("Option type must be 'call' or 'put'")
     return price
 
-# Monte Carlo simulation for option pricing and Greeks
-def monte_carlo_simulation(S, K, T, r, sigma, option_type='call', option_style='vanilla', n_sims=10000):
-    """Monte Carlo simulation for option pricing and Greeks"""
-    dt = T
-    eps_delta = S * 0.01  # 1% of spot price
-    eps_vega = sigma * 0.01  # 1% of volatility
-    eps_theta = T * 0.01  # 1% of time to maturity
-    eps_rho = 0.0001  # 1 basis point
-    
-    # Generate random paths for base case
-    Z = np.random.standard_normal(n_sims)
-    ST = S * np.exp((r - 0.5 * sigma**2) * dt + sigma * np.sqrt(dt) * Z)
-    
-    # For Delta calculation
-    ST_delta_up = (S + eps_delta) * np.exp((r - 0.5 * sigma**2) * dt + sigma * np.sqrt(dt) * Z)
-    ST_delta_down = (S - eps_delta) * np.exp((r - 0.5 * sigma**2) * dt + sigma * np.sqrt(dt) * Z)
-    
-    # For Vega calculation
-    ST_vega = S * np.exp((r - 0.5 * (sigma + eps_vega)**2) * dt + (sigma + eps_vega) * np.sqrt(dt) * Z)
-    
-    # For Theta calculation
-    ST_theta = S * np.exp((r - 0.5 * sigma**2) * (dt - eps_theta) + sigma * np.sqrt(dt - eps_theta) * Z)
-    
-    # For Rho calculation
-    ST_rho = S * np.exp(((r + eps_rho) - 0.5 * sigma**2) * dt + sigma * np.sqrt(dt) * Z)
-    
-    # Calculate payoffs for all cases
-    def get_payoff(ST_array):
-        if option_style == 'vanilla':
-            if option_type == 'call':
-                return np.maximum(ST_array - K, 0)
-            else:  # put
-                return np.maximum(K - ST_array, 0)
-        else:  # digital
-            if option_type == 'call':
-                return np.where(ST_array > K, 1, 0)
-            else:  # put
-                return np.where(ST_array < K, 1, 0)
-    
-    payoffs = get_payoff(ST)
-    payoffs_delta_up = get_payoff(ST_delta_up)
-    payoffs_delta_down = get_payoff(ST_delta_down)
-    payoffs_vega = get_payoff(ST_vega)
-    payoffs_theta = get_payoff(ST_theta)
-    payoffs_rho = get_payoff(ST_rho)
-    
-    # Discount all payoffs
+# Price and Greeks over whole grids of inputs in one broadcast call
+def greek_grid(S, K, T, r, sigma, option_type='call', option_style='vanilla', dtype=np.float64):
+    """Return (price, delta, vega, gamma, theta, rho) arrays, same conventions as black_scholes/greeks
+    and digital_option/digital_greeks. Inputs are broadcast against each other, so a spot vector gives
+    curves and e.g. greek_grid(S[:, None], K, T, r, sigma[None, :]) gives spot x vol surfaces.
+    dtype=np.float32 computes large grids in single precision, at about 1e-6 relative accuracy."""
+    if option_style == 'vanilla':
+        res = BS_chain(S, K, T, r, sigma, 0.0, option_type == 'call', dtype)
+        return res.price, res.delta, res.vega, res.gamma, res.theta, res.rho
+    
+    S, K, T, r, sigma = np.broadcast_arrays(*[np.asarray(x, dtype=dtype) for x in (S, K, T, r, sigma)])
+    sqrt_T = np.sqrt(T)
+    d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * sqrt_T)
+    d2 = d1 - sigma * sqrt_T
     discount = np.exp(-r * T)
-    option_prices = discount * payoffs
-    
-    # Calculate price and standard error
-    price = np.mean(option_prices)
-    std_dev = np.std(option_prices)
-    std_error = std_dev / np.sqrt(n_sims)
-    
-    # Calculate Greeks
-    delta = np.mean(discount * (payoffs_delta_up - payoffs_delta_down)) / (2 * eps_delta)
-    # For Gamma calculation (second derivative of price with respect to S)
-    gamma_diff = (payoffs_delta_up - 2*payoffs + payoffs_delta_down)
-    gamma = np.mean(discount * gamma_diff) / (eps_delta**2)
-    vega = np.mean(discount * (payoffs_vega - payoffs)) / eps_vega
-    # Use adjusted discount for theta calculation
-    discount_theta = np.exp(-r * (T - eps_theta))
-    theta = np.mean(discount_theta * payoffs_theta - discount * payoffs) / eps_theta
-    # Use adjusted discount for rho calculation
-    discount_rho = np.exp(-(r + eps_rho) * T)
-    rho = np.mean(discount_rho * payoffs_rho - discount * payoffs) / eps_rho
+    discount_n_d2 = discount * n(d2)
     
-    # Calculate standard errors for Greeks
-    delta_se = np.std(discount * (payoffs_delta_up - payoffs_delta_down)) / (2 * eps_delta * np.sqrt(n_sims))
-    gamma_se = np.std(discount * gamma_diff) / (eps_delta**2 * np.sqrt(n_sims))
-    vega_se = np.std(discount * (payoffs_vega - payoffs)) / (eps_vega * np.sqrt(n_sims))
-    theta_se = np.std(discount * (payoffs_theta - payoffs)) / (eps_theta * np.sqrt(n_sims))
-    rho_se = np.std(discount * (payoffs_rho - payoffs)) / (eps_rho * np.sqrt(n_sims))
+    # digital call, as in digital_option/digital_greeks
+    price = discount * N(d2)
+    delta = discount_n_d2 / (S * sigma * sqrt_T)
+    vega = -discount_n_d2 * d1 / sigma
+    gamma = -discount_n_d2 * d1 / (S**2 * sigma**2 * T)
+    theta = r * price - discount_n_d2 * ((r - 0.5 * sigma ** 2) / (sigma * sqrt_T) - d2 / (2 * T))
+    rho = -T * price + discount_n_d2 * sqrt_T / sigma
     
-    return (price, std_error, delta, delta_se, gamma, gamma_se, 
-            vega, vega_se, theta, theta_se, rho, rho_se)
+    # the digital put is a zero-coupon bond minus the digital call
+    if option_type == 'put':
+        price = discount - price
+        delta, vega, gamma = -delta, -vega, -gamma
+        theta = r * discount - theta
+        rho = -T * discount - rho
+    
+    return price, delta, vega, gamma, theta, rho
+
+# Per-path Monte Carlo estimators of the price and the Greeks
+def mc_estimators(Z, S, K, T, r, sigma, option_type='call', option_style='vanilla'):
+    """Yield the per-path estimators of price, delta, gamma, vega, theta and rho, in that order.
+    All of them come from the same draws Z. Vanilla Greeks are pathwise derivatives of the
+    discounted payoff (gamma uses the likelihood-ratio/pathwise mix, as the payoff has a kink).
+    Digital payoffs are not differentiable, so their Greeks are likelihood-ratio estimators:
+    payoff times the derivative of the log density of ST. Each array is yielded before the
+    next one is computed, so the caller can reduce it and let it go. Estimators have the dtype of Z."""
+    sqrt_T = math.sqrt(T)
+    discount = math.exp(-r * T)
+    ST = S * np.exp((r - 0.5 * sigma**2) * T + sigma * sqrt_T * Z)
+    sign = 1.0 if option_type == 'call' else -1.0
+    in_the_money = (sign * (ST - K)) > 0
+    
+    if option_style == 'vanilla':
+        payoff = np.maximum(sign * (ST - K), 0.0)
+        yield discount * payoff
+        # discounted payoff slope times ST: dPayoff/dST = sign on the exercise region
+        slope_ST = np.where(in_the_money, sign * discount * ST, 0.0)
+        yield slope_ST / S
+        yield slope_ST * (Z / (sigma * sqrt_T) - 1) / S**2
+        yield slope_ST * (sqrt_T * Z - sigma * T)
+        yield r * discount * payoff - slope_ST * ((r - 0.5 * sigma**2) + 0.5 * sigma * Z / sqrt_T)
+        yield T * (slope_ST - discount * payoff)
+    else:
+        payoff = in_the_money.astype(Z.dtype)
+        payoff *= discount
+        yield payoff
+        # likelihood-ratio weights: derivatives of log p(ST) with respect to each parameter
+        yield payoff * Z / (S * sigma * sqrt_T)
+        yield payoff * ((Z**2 - 1) / (sigma**2 * T) - Z / (sigma * sqrt_T)) / S**2
+        yield payoff * ((Z**2 - 1) / sigma - sqrt_T * Z)
+        yield payoff * (r - Z * (r - 0.5 * sigma**2) / (sigma * sqrt_T) - (Z**2 - 1) / (2 * T))
+        yield payoff * (sqrt_T * Z / sigma - T)
+
+# Monte Carlo simulation for option pricing and Greeks
+def monte_carlo_simulation(S, K, T, r, sigma, option_type='call', option_style='vanilla', n_sims=10000, rng=None,
+                           dtype=np.float64, draws=None):
+    """Monte Carlo simulation for option pricing and Greeks.
+    Price and all five Greeks come from one set of n_sims paths (see mc_estimators), each with
+    its standard error. rng is a numpy Generator for reproducible runs; default is the global
+    np.random state. dtype=np.float32 draws and evolves the paths in single precision; means
+    and standard errors are still accumulated in float64. draws replaces rng with given normals,
+    e.g. a crn_store.CRNStore memory map shared by all positions on one underlying; the first
+    n_sims are used in place."""
+    if draws is not None:
+        if len(draws) < n_sims:
+            raise ValueError("draws holds %d normals, %d are needed" % (len(draws), n_sims))
+        Z = np.asarray(draws[:n_sims], dtype=dtype)
+    else:
+        Z = standard_normal(rng if rng is not None else np.random, n_sims, dtype)
+    
+    results = []
+    for estimator in mc_estimators(Z, S, K, T, r, sigma, option_type, option_style):
+        results.append(np.mean(estimator, dtype=np.float64))
+        results.append(np.std(estimator, dtype=np.float64) / np.sqrt(n_sims))
+    
+    # (price, std_error, delta, delta_se, gamma, gamma_se, vega, vega_se, theta, theta_se, rho, rho_se)
+    return tuple(results)
+
+# Chunked Monte Carlo: running estimates after every chunk of paths
+def monte_carlo_chunks(S, K, T, r, sigma, option_type='call', option_style='vanilla', n_sims=10000,
+                       chunk_size=100000, rng=None, dtype=np.float64):
+    """Run monte_carlo_simulation in chunks of paths and yield (paths_done, results) after each chunk,
+    where results is the same 12-tuple of estimates and standard errors over all paths so far.
+    Memory is bounded by the chunk size, and the caller can stop iterating at any time."""
+    if rng is None:
+        rng = np.random
+    stats = [RunningStats() for i in range(6)]
+    done = 0
+    while done < n_sims:
+        size = min(chunk_size, n_sims - done)
+        Z = standard_normal(rng, size, dtype)
+        for stat, estimator in zip(stats, mc_estimators(Z, S, K, T, r, sigma, option_type, option_style)):
+            stat.update(estimator)
+        done += size
+        results = []
+        for stat in stats:
+            results.append(stat.mean[0])
+            results.append(stat.standard_error()[0])
+        yield done, tuple(results)
+
+# Reproducible multi-process Monte Carlo, as bsm.monte_carlo_option_pricing_parallel
+def monte_carlo_parallel(S, K, T, r, sigma, option_type='call', option_style='vanilla', n_sims=10000, seed=None,
+                         n_workers=None, block_size=2**20, dtype=np.float64):
+    """Price and Greeks from the same estimators as monte_carlo_simulation, simulated across a process
+    pool, returned as the same 12-tuple. The n_sims paths are cut into blocks of block_size; block i draws
+    from a Generator seeded with the i-th child of SeedSequence(seed).spawn, and the blocks' statistics are
+    merged in block order. Neither depends on n_workers, so a given seed gives bit-identical results for
+    any number of workers. n_workers defaults to os.cpu_count(); 1 runs in-process."""
+    check_dtype(dtype)
+    sizes = [min(block_size, n_sims - start) for start in range(0, n_sims, block_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(child, size, S, K, T, r, sigma, option_type, option_style, dtype) for child, size in zip(seeds, sizes)]
+    if n_workers is None:
+        n_workers = os.cpu_count()
+    stats = [RunningStats() for i in range(6)]
+    if n_workers == 1:
+        _merge_blocks(stats, map(_block_estimates, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            # map returns results in task order, whichever worker finishes first
+            _merge_blocks(stats, pool.map(_block_estimates, tasks))
+    results = []
+    for stat in stats:
+        results.append(stat.mean[0])
+        results.append(stat.standard_error()[0])
+    return tuple(results)
+
+def _block_estimates(task):
+    # one block of monte_carlo_parallel; module level so that it can be pickled
+    seed, size, S, K, T, r, sigma, option_type, option_style, dtype = task
+    Z = np.random.default_rng(seed).standard_normal(size, dtype=dtype)
+    stats = [RunningStats() for i in range(6)]
+    for stat, estimator in zip(stats, mc_estimators(Z, S, K, T, r, sigma, option_type, option_style)):
+        stat.update(estimator)
+    return stats
+
+def _merge_blocks(stats, blocks):
+    for block in blocks:
+        for stat, partial in zip(stats, block):
+            stat.merge(partial)
 
 # Function to calculate option prices and Greeks, and update the GUI
-def calculate_option():
+def calculate_option(show_errors=True):
     try:
         S = float(entry_S.get())
         K = float(entry_K.get())
@@ -165,6 +261,9 @@ def calculate_option():
         sigma = float(entry_sigma.get()) / 100
         option_type = var_option_type.get()
         option_style = var_option_style.get()
+        # a zero (e.g. T while "0.5" is being typed) would divide by zero in the pricers
+        if min(S, K, T, sigma) <= 0:
+            raise ValueError("S, K, T and sigma must be positive")
         
         if option_style == 'vanilla':
             call_price, put_price = black_scholes(S, K, T, r, sigma)
@@ -187,9 +286,29 @@ def calculate_option():
         
         plot_graphs(S, K, T, r, sigma, option_type, option_style)
     except ValueError:
-        messagebox.showerror("输入错误", "请输入有效的数字")
+        if show_errors:
+            messagebox.showerror("输入错误", "请输入有效的数字")
+
+# Live recompute while parameters are edited: keystrokes within 30 ms collapse into one update,
+# and half-typed values are skipped silently instead of raising an error box
+live_update_job = None
+
+def schedule_live_update(event=None):
+    global live_update_job
+    if live_update_job is not None:
+        root.after_cancel(live_update_job)
+    live_update_job = root.after(30, run_live_update)
+
+def run_live_update():
+    global live_update_job
+    live_update_job = None
+    calculate_option(show_errors=False)
+
+# Function to calculate Monte Carlo option prices and update the GUI.
+# The simulation runs in chunks on a background thread; the Tk main thread polls its
+# results queue, refreshes the labels and progress bar, and can cancel between chunks.
+mc_cancel = threading.Event()
 
-# Function to calculate Monte Carlo option prices and update the GUI
 def calculate_monte_carlo():
     try:
         S = float(entry_S_mc.get())
@@ -200,365 +319,397 @@ def calculate_monte_carlo():
         n_sims = int(entry_n_sims.get())
         option_type = var_option_type_mc.get()
         option_style = var_option_style_mc.get()
-        
-        # Get Monte Carlo results
-        (price, std_error, delta_mc, delta_se, gamma_mc, gamma_se, 
-         vega_mc, vega_se, theta_mc, theta_se, rho_mc, rho_se) = monte_carlo_simulation(
-            S, K, T, r, sigma, 
-            option_type=option_type, 
-            option_style=option_style, 
-            n_sims=n_sims
-        )
-        
-        # Get analytical results
-        if option_style == 'vanilla':
-            call_price, put_price = black_scholes(S, K, T, r, sigma)
-            analytical_price = call_price if option_type == 'call' else put_price
-            delta_an, vega_an, gamma_an, theta_an, rho_an = greeks(
-                S, K, T, r, sigma, option_type=option_type
-            )
-        else:
-            analytical_price = digital_option(S, K, T, r, sigma, option_type)
-            delta_an, vega_an, gamma_an, theta_an, rho_an = digital_greeks(
-                S, K, T, r, sigma, option_type=option_type
-            )
-        
-        # Calculate differences
-        price_diff = abs(price - analytical_price)
-        delta_diff = abs(delta_mc - delta_an)
-        gamma_diff = abs(gamma_mc - gamma_an)
-        vega_diff = abs(vega_mc - vega_an)
-        theta_diff = abs(theta_mc - theta_an)
-        rho_diff = abs(rho_mc - rho_an)
-        
-        # Update results with both MC and analytical values, plus differences
-        label_price_mc.config(
-            text=f"{option_type.capitalize()} {option_style.capitalize()} Option Price:\n"
-                 f"MC: {price:.4f} ± {std_error:.4f}\n"
-                 f"Analytical: {analytical_price:.4f}\n"
-                 f"Difference: {price_diff:.4f}"
-        )
-        
-        label_delta_mc.config(
-            text=f"Delta:\nMC: {delta_mc:.4f} ± {delta_se:.4f}\n"
-                 f"Analytical: {delta_an:.4f}\n"
-                 f"Difference: {delta_diff:.4f}"
-        )
-        label_gamma_mc.config(
-            text=f"Gamma:\nMC: {gamma_mc:.4f} ± {gamma_se:.4f}\n"
-                 f"Analytical: {gamma_an:.4f}\n"
-                 f"Difference: {gamma_diff:.4f}"
-        )
-        label_vega_mc.config(
-            text=f"Vega:\nMC: {vega_mc:.4f} ± {vega_se:.4f}\n"
-                 f"Analytical: {vega_an:.4f}\n"
-                 f"Difference: {vega_diff:.4f}"
-        )
-        label_theta_mc.config(
-            text=f"Theta:\nMC: {theta_mc:.4f} ± {theta_se:.4f}\n"
-                 f"Analytical: {theta_an:.4f}\n"
-                 f"Difference: {theta_diff:.4f}"
-        )
-        label_rho_mc.config(
-            text=f"Rho:\nMC: {rho_mc:.4f} ± {rho_se:.4f}\n"
-                 f"Analytical: {rho_an:.4f}\n"
-                 f"Difference: {rho_diff:.4f}"
-        )
-        
     except ValueError:
         messagebox.showerror("输入错误", "请输入有效的数字")
+        return
+    
+    # Get analytical results
+    if option_style == 'vanilla':
+        call_price, put_price = black_scholes(S, K, T, r, sigma)
+        analytical_price = call_price if option_type == 'call' else put_price
+        delta_an, vega_an, gamma_an, theta_an, rho_an = greeks(
+            S, K, T, r, sigma, option_type=option_type
+        )
+    else:
+        analytical_price = digital_option(S, K, T, r, sigma, option_type)
+        delta_an, vega_an, gamma_an, theta_an, rho_an = digital_greeks(
+            S, K, T, r, sigma, option_type=option_type
+        )
+    analytical = (analytical_price, delta_an, gamma_an, vega_an, theta_an, rho_an)
+    
+    mc_cancel.clear()
+    results = queue.Queue()
+    worker = threading.Thread(target=monte_carlo_worker, daemon=True,
+                              args=(results, S, K, T, r, sigma, option_type, option_style, n_sims))
+    progress_mc.config(maximum=n_sims, value=0)
+    label_progress_mc.config(text=f"0 / {n_sims}")
+    button_calculate_mc.state(['disabled'])
+    button_cancel_mc.state(['!disabled'])
+    worker.start()
+    root.after(50, poll_monte_carlo, results, analytical, option_type, option_style, n_sims)
+
+# Background thread: never touches Tk widgets, only posts to the results queue
+def monte_carlo_worker(results, S, K, T, r, sigma, option_type, option_style, n_sims):
+    try:
+        for done, estimates in monte_carlo_chunks(S, K, T, r, sigma, option_type, option_style, n_sims):
+            results.put(('progress', done, estimates))
+            if mc_cancel.is_set():
+                break
+    except Exception as e:
+        results.put(('error', 0, str(e)))
+    results.put(('finished', 0, None))
+
+def cancel_monte_carlo():
+    mc_cancel.set()
+    button_cancel_mc.state(['disabled'])
+
+def poll_monte_carlo(results, analytical, option_type, option_style, n_sims):
+    latest = None
+    finished = False
+    while True:
+        try:
+            kind, done, payload = results.get_nowait()
+        except queue.Empty:
+            break
+        if kind == 'progress':
+            latest = (done, payload)
+        elif kind == 'error':
+            messagebox.showerror("Monte Carlo", payload)
+        else:
+            finished = True
+    
+    # only the newest estimates are drawn, however many chunks finished since the last poll
+    if latest is not None:
+        done, estimates = latest
+        progress_mc.config(value=done)
+        label_progress_mc.config(text=f"{done} / {n_sims}" + (" (cancelled)" if finished and done < n_sims else ""))
+        update_monte_carlo_labels(estimates, analytical, option_type, option_style)
+    if finished:
+        button_calculate_mc.state(['!disabled'])
+        button_cancel_mc.state(['disabled'])
+    else:
+        root.after(50, poll_monte_carlo, results, analytical, option_type, option_style, n_sims)
+
+def update_monte_carlo_labels(estimates, analytical, option_type, option_style):
+    (price, std_error, delta_mc, delta_se, gamma_mc, gamma_se, 
+     vega_mc, vega_se, theta_mc, theta_se, rho_mc, rho_se) = estimates
+    analytical_price, delta_an, gamma_an, vega_an, theta_an, rho_an = analytical
+    
+    # Calculate differences
+    price_diff = abs(price - analytical_price)
+    delta_diff = abs(delta_mc - delta_an)
+    gamma_diff = abs(gamma_mc - gamma_an)
+    vega_diff = abs(vega_mc - vega_an)
+    theta_diff = abs(theta_mc - theta_an)
+    rho_diff = abs(rho_mc - rho_an)
+    
+    # Update results with both MC and analytical values, plus differences
+    label_price_mc.config(
+        text=f"{option_type.capitalize()} {option_style.capitalize()} Option Price:\n"
+             f"MC: {price:.4f} ± {std_error:.4f}\n"
+             f"Analytical: {analytical_price:.4f}\n"
+             f"Difference: {price_diff:.4f}"
+    )
+    
+    label_delta_mc.config(
+        text=f"Delta:\nMC: {delta_mc:.4f} ± {delta_se:.4f}\n"
+             f"Analytical: {delta_an:.4f}\n"
+             f"Difference: {delta_diff:.4f}"
+    )
+    label_gamma_mc.config(
+        text=f"Gamma:\nMC: {gamma_mc:.4f} ± {gamma_se:.4f}\n"
+             f"Analytical: {gamma_an:.4f}\n"
+             f"Difference: {gamma_diff:.4f}"
+    )
+    label_vega_mc.config(
+        text=f"Vega:\nMC: {vega_mc:.4f} ± {vega_se:.4f}\n"
+             f"Analytical: {vega_an:.4f}\n"
+             f"Difference: {vega_diff:.4f}"
+    )
+    label_theta_mc.config(
+        text=f"Theta:\nMC: {theta_mc:.4f} ± {theta_se:.4f}\n"
+             f"Analytical: {theta_an:.4f}\n"
+             f"Difference: {theta_diff:.4f}"
+    )
+    label_rho_mc.config(
+        text=f"Rho:\nMC: {rho_mc:.4f} ± {rho_se:.4f}\n"
+             f"Analytical: {rho_an:.4f}\n"
+             f"Difference: {rho_diff:.4f}"
+    )
+
+# Persistent plot panel: the figure, axes and one line per quantity are created once by
+# init_plot_panel, then plot_graphs only swaps the line data and asks for an idle redraw
+PLOT_PANELS = [('Price', 'blue'), ('Delta', 'green'), ('Vega', 'purple'),
+               ('Gamma', 'cyan'), ('Theta', 'lime'), ('Rho', 'teal')]
+plot_lines = []
+plot_canvas = None
+
+def init_plot_panel():
+    global plot_canvas
+    fig = Figure(figsize=(10, 9))
+    axs = fig.subplots(3, 2)
+    for ax, (name, color) in zip(axs.flat, PLOT_PANELS):
+        line, = ax.plot([], [], label=name, color=color)
+        ax.set_title(f'{name} vs Spot Price')
+        ax.set_xlabel('Spot Price')
+        ax.set_ylabel(name)
+        ax.legend(loc='best')
+        plot_lines.append(line)
+    fig.tight_layout()
+    
+    plot_canvas = FigureCanvasTkAgg(fig, master=frame_plot)
+    plot_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
 
 # Function to plot graphs for option prices and Greeks
 def plot_graphs(S, K, T, r, sigma, option_type, option_style):
-    spot_prices = np.linspace(0.001*S, 3 * S, 100)
-    
-    prices = []
-    deltas = []
-    vegas = []
-    gammas = []
-    thetas = []
-    rhos = []
-    
-    for s in spot_prices:
-        if option_style == 'vanilla':
-            if option_type == 'call':
-                price, _ = black_scholes(s, K, T, r, sigma)
-                delta, vega, gamma, theta, rho = greeks(s, K, T, r, sigma, option_type='call')
-            else:
-                _, price = black_scholes(s, K, T, r, sigma)
-                delta, vega, gamma, theta, rho = greeks(s, K, T, r, sigma, option_type='put')
-        else:
-            price = digital_option(s, K, T, r, sigma, option_type)
-            delta, vega, gamma, theta, rho = digital_greeks(s, K, T, r, sigma, option_type)
-        
-        prices.append(price)
-        deltas.append(delta)
-        vegas.append(vega)
-        gammas.append(gamma)
-        thetas.append(theta)
-        rhos.append(rho)
-    
-    fig, axs = plt.subplots(6, 1, figsize=(10, 30))
-    
-    # Plot Prices
-    axs[0].plot(spot_prices, prices, label=f'{option_type.capitalize()} {option_style.capitalize()} Option Price', color='blue')
-    axs[0].set_title('Price vs Spot Price')
-    axs[0].set_xlabel('Spot Price')
-    axs[0].set_ylabel('Price')
-    axs[0].legend()
-    
-    # Plot Deltas
-    axs[1].plot(spot_prices, deltas, label='Delta', color='green')
-    axs[1].set_title('Delta vs Spot Price')
-    axs[1].set_xlabel('Spot Price')
-    axs[1].set_ylabel('Delta')
-    axs[1].legend()
-    
-    # Plot Vegas
-    axs[2].plot(spot_prices, vegas, label='Vega', color='purple')
-    axs[2].set_title('Vega vs Spot Price')
-    axs[2].set_xlabel('Spot Price')
-    axs[2].set_ylabel('Vega')
-    axs[2].legend()
-    
-    # Plot Gammas
-    axs[3].plot(spot_prices, gammas, label='Gamma', color='cyan')
-    axs[3].set_title('Gamma vs Spot Price')
-    axs[3].set_xlabel('Spot Price')
-    axs[3].set_ylabel('Gamma')
-    axs[3].legend()
-    
-    # Plot Thetas
-    axs[4].plot(spot_prices, thetas, label='Theta', color='lime')
-    axs[4].set_title('Theta vs Spot Price')
-    axs[4].set_xlabel('Spot Price')
-    axs[4].set_ylabel('Theta')
-    axs[4].legend()
-    
-    # Plot Rhos
-    axs[5].plot(spot_prices, rhos, label='Rho', color='teal')
-    axs[5].set_title('Rho vs Spot Price')
-    axs[5].set_xlabel('Spot Price')
-    axs[5].set_ylabel('Rho')
-    axs[5].legend()
-    
-    plt.tight_layout()
-    
-    # Integrate plot into the GUI
-    for widget in frame_plot.winfo_children():
-        widget.destroy()
-    
-    canvas = FigureCanvasTkAgg(fig, master=frame_plot)
-    canvas.draw()
-    canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-
-# Create the main window
-root = tk.Tk()
-root.title("期权计算器")
-root.geometry("800x1000")
-
-# Create a Notebook widget to hold different calculators
-notebook = ttk.Notebook(root)
-notebook.pack(expand=1, fill="both")
-
-# Create the Option calculator tab
-frame_option = ttk.Frame(notebook)
-notebook.add(frame_option, text="Option 计算器")
-
-# Create a frame for inputs and results
-frame_inputs = ttk.Frame(frame_option)
-frame_inputs.grid(row=0, column=0, padx=10, pady=10, sticky=tk.N+tk.S+tk.W)
-
-# Move all input fields and labels to frame_inputs
-label_S = ttk.Label(frame_inputs, text="股票价格 (S):")
-entry_S = ttk.Entry(frame_inputs)
-entry_S.insert(0, "100")  # Default value
-
-label_K = ttk.Label(frame_inputs, text="执行价格 (K):")
-entry_K = ttk.Entry(frame_inputs)
-entry_K.insert(0, "100")  # Default value
-
-label_T = ttk.Label(frame_inputs, text="到期时间 (T) 年:")
-entry_T = ttk.Entry(frame_inputs)
-entry_T.insert(0, "1")  # Default value
-
-label_r = ttk.Label(frame_inputs, text="无风险利率 (%) :")
-entry_r = ttk.Entry(frame_inputs)
-entry_r.insert(0, "5")  # Default value
-
-label_sigma = ttk.Label(frame_inputs, text="波动率 (%) :")
-entry_sigma = ttk.Entry(frame_inputs)
-entry_sigma.insert(0, "20")  # Default value
-
-var_option_type = tk.StringVar(value="call")
-var_option_style = tk.StringVar(value="vanilla")
-
-# Replace Radiobuttons with Comboboxes for Option Type
-label_option_type = ttk.Label(frame_inputs, text="Option Type:")
-combo_option_type = ttk.Combobox(frame_inputs, textvariable=var_option_type, state="readonly")
-combo_option_type['values'] = ("call", "put")
-combo_option_type.current(0)
-
-# Replace Radiobuttons with Comboboxes for Option Style
-label_option_style = ttk.Label(frame_inputs, text="Option Style:")
-combo_option_style = ttk.Combobox(frame_inputs, textvariable=var_option_style, state="readonly")
-combo_option_style['values'] = ("vanilla", "digital")
-combo_option_style.current(0)
-
-button_calculate = ttk.Button(frame_inputs, text="计算", command=calculate_option)
-
-label_price = ttk.Label(frame_inputs, text="Option Price: ")
-label_delta = ttk.Label(frame_inputs, text="Delta: ")
-label_vega = ttk.Label(frame_inputs, text="Vega: ")
-label_gamma = ttk.Label(frame_inputs, text="Gamma: ")
-label_theta = ttk.Label(frame_inputs, text="Theta: ")
-label_rho = ttk.Label(frame_inputs, text="Rho: ")
-
-# Layout the input fields and labels in frame_inputs
-label_S.grid(row=0, column=0, padx=10, pady=5, sticky=tk.W)
-entry_S.grid(row=0, column=1, padx=10, pady=5)
-
-label_K.grid(row=1, column=0, padx=10, pady=5, sticky=tk.W)
-entry_K.grid(row=1, column=1, padx=10, pady=5)
-
-label_T.grid(row=2, column=0, padx=10, pady=5, sticky=tk.W)
-entry_T.grid(row=2, column=1, padx=10, pady=5)
-
-label_r.grid(row=3, column=0, padx=10, pady=5, sticky=tk.W)
-entry_r.grid(row=3, column=1, padx=10, pady=5)
-
-label_sigma.grid(row=4, column=0, padx=10, pady=5, sticky=tk.W)
-entry_sigma.grid(row=4, column=1, padx=10, pady=5)
-
-label_option_type.grid(row=5, column=0, padx=10, pady=5, sticky=tk.W)
-combo_option_type.grid(row=5, column=1, padx=10, pady=5, sticky=tk.W)
-
-label_option_style.grid(row=6, column=0, padx=10, pady=5, sticky=tk.W)
-combo_option_style.grid(row=6, column=1, padx=10, pady=5, sticky=tk.W)
-
-button_calculate.grid(row=7, columnspan=2, pady=20)
-
-label_price.grid(row=8, columnspan=2, pady=5)
-label_delta.grid(row=9, columnspan=2, pady=5)
-label_vega.grid(row=10, columnspan=2, pady=5)
-label_gamma.grid(row=11, columnspan=2, pady=5)
-label_theta.grid(row=12, columnspan=2, pady=5)
-label_rho.grid(row=13, columnspan=2, pady=5)
-
-# Create a frame for the plot on the right
-frame_plot_container = ttk.Frame(frame_option)
-frame_plot_container.grid(row=0, column=1, padx=10, pady=10, sticky=tk.N+tk.S+tk.E+tk.W)
-
-# Adjust frame_plot to be inside frame_plot_container
-frame_plot = ttk.Frame(frame_plot_container)
-frame_plot.pack(fill=tk.BOTH, expand=True)
+    spot_prices = np.linspace(0.001*S, 3 * S, 2000)
+    
+    values = greek_grid(spot_prices, K, T, r, sigma, option_type, option_style)
+    
+    for line, y in zip(plot_lines, values):
+        line.set_data(spot_prices, y)
+        ax = line.axes
+        ax.relim()
+        ax.autoscale_view()
+    plot_lines[0].axes.get_legend().get_texts()[0].set_text(
+        f'{option_type.capitalize()} {option_style.capitalize()} Option Price')
+    
+    # coalesces with any other pending redraw instead of rendering synchronously
+    plot_canvas.draw_idle()
+
+
+# The window is only built by main(), so the pricing functions above can be
+# imported without a display (e.g. by benchmarks/run_benchmarks.py)
+def main():
+    # the callbacks above read the widgets as module globals
+    global root, frame_plot, entry_S, entry_K, entry_T, entry_r, entry_sigma, var_option_type
+    global var_option_style, label_price, label_delta, label_vega, label_gamma, label_theta, label_rho
+    global entry_S_mc, entry_K_mc, entry_T_mc, entry_r_mc, entry_sigma_mc, entry_n_sims, var_option_type_mc
+    global var_option_style_mc, progress_mc, label_progress_mc, button_calculate_mc, button_cancel_mc
+    global label_price_mc, label_delta_mc, label_gamma_mc, label_vega_mc, label_theta_mc, label_rho_mc
+    # Create the main window
+    root = tk.Tk()
+    root.title("期权计算器")
+    root.geometry("800x1000")
+
+    # Create a Notebook widget to hold different calculators
+    notebook = ttk.Notebook(root)
+    notebook.pack(expand=1, fill="both")
+
+    # Create the Option calculator tab
+    frame_option = ttk.Frame(notebook)
+    notebook.add(frame_option, text="Option 计算器")
+
+    # Create a frame for inputs and results
+    frame_inputs = ttk.Frame(frame_option)
+    frame_inputs.grid(row=0, column=0, padx=10, pady=10, sticky=tk.N+tk.S+tk.W)
+
+    # Move all input fields and labels to frame_inputs
+    label_S = ttk.Label(frame_inputs, text="股票价格 (S):")
+    entry_S = ttk.Entry(frame_inputs)
+    entry_S.insert(0, "100")  # Default value
+
+    label_K = ttk.Label(frame_inputs, text="执行价格 (K):")
+    entry_K = ttk.Entry(frame_inputs)
+    entry_K.insert(0, "100")  # Default value
+
+    label_T = ttk.Label(frame_inputs, text="到期时间 (T) 年:")
+    entry_T = ttk.Entry(frame_inputs)
+    entry_T.insert(0, "1")  # Default value
+
+    label_r = ttk.Label(frame_inputs, text="无风险利率 (%) :")
+    entry_r = ttk.Entry(frame_inputs)
+    entry_r.insert(0, "5")  # Default value
+
+    label_sigma = ttk.Label(frame_inputs, text="波动率 (%) :")
+    entry_sigma = ttk.Entry(frame_inputs)
+    entry_sigma.insert(0, "20")  # Default value
+
+    var_option_type = tk.StringVar(value="call")
+    var_option_style = tk.StringVar(value="vanilla")
+
+    # Replace Radiobuttons with Comboboxes for Option Type
+    label_option_type = ttk.Label(frame_inputs, text="Option Type:")
+    combo_option_type = ttk.Combobox(frame_inputs, textvariable=var_option_type, state="readonly")
+    combo_option_type['values'] = ("call", "put")
+    combo_option_type.current(0)
+
+    # Replace Radiobuttons with Comboboxes for Option Style
+    label_option_style = ttk.Label(frame_inputs, text="Option Style:")
+    combo_option_style = ttk.Combobox(frame_inputs, textvariable=var_option_style, state="readonly")
+    combo_option_style['values'] = ("vanilla", "digital")
+    combo_option_style.current(0)
+
+    button_calculate = ttk.Button(frame_inputs, text="计算", command=calculate_option)
+
+    label_price = ttk.Label(frame_inputs, text="Option Price: ")
+    label_delta = ttk.Label(frame_inputs, text="Delta: ")
+    label_vega = ttk.Label(frame_inputs, text="Vega: ")
+    label_gamma = ttk.Label(frame_inputs, text="Gamma: ")
+    label_theta = ttk.Label(frame_inputs, text="Theta: ")
+    label_rho = ttk.Label(frame_inputs, text="Rho: ")
+
+    # Layout the input fields and labels in frame_inputs
+    label_S.grid(row=0, column=0, padx=10, pady=5, sticky=tk.W)
+    entry_S.grid(row=0, column=1, padx=10, pady=5)
+
+    label_K.grid(row=1, column=0, padx=10, pady=5, sticky=tk.W)
+    entry_K.grid(row=1, column=1, padx=10, pady=5)
+
+    label_T.grid(row=2, column=0, padx=10, pady=5, sticky=tk.W)
+    entry_T.grid(row=2, column=1, padx=10, pady=5)
+
+    label_r.grid(row=3, column=0, padx=10, pady=5, sticky=tk.W)
+    entry_r.grid(row=3, column=1, padx=10, pady=5)
+
+    label_sigma.grid(row=4, column=0, padx=10, pady=5, sticky=tk.W)
+    entry_sigma.grid(row=4, column=1, padx=10, pady=5)
+
+    label_option_type.grid(row=5, column=0, padx=10, pady=5, sticky=tk.W)
+    combo_option_type.grid(row=5, column=1, padx=10, pady=5, sticky=tk.W)
+
+    label_option_style.grid(row=6, column=0, padx=10, pady=5, sticky=tk.W)
+    combo_option_style.grid(row=6, column=1, padx=10, pady=5, sticky=tk.W)
+
+    button_calculate.grid(row=7, columnspan=2, pady=20)
+
+    label_price.grid(row=8, columnspan=2, pady=5)
+    label_delta.grid(row=9, columnspan=2, pady=5)
+    label_vega.grid(row=10, columnspan=2, pady=5)
+    label_gamma.grid(row=11, columnspan=2, pady=5)
+    label_theta.grid(row=12, columnspan=2, pady=5)
+    label_rho.grid(row=13, columnspan=2, pady=5)
+
+    # Create a frame for the plot on the right
+    frame_plot_container = ttk.Frame(frame_option)
+    frame_plot_container.grid(row=0, column=1, padx=10, pady=10, sticky=tk.N+tk.S+tk.E+tk.W)
+
+    # Adjust frame_plot to be inside frame_plot_container
+    frame_plot = ttk.Frame(frame_plot_container)
+    frame_plot.pack(fill=tk.BOTH, expand=True)
+    init_plot_panel()
 
-# Configure grid weights for proper scaling
-frame_option.columnconfigure(0, weight=1)
-frame_option.columnconfigure(1, weight=2)
-frame_option.rowconfigure(0, weight=1)
+    for entry in (entry_S, entry_K, entry_T, entry_r, entry_sigma):
+        entry.bind('<KeyRelease>', schedule_live_update)
+    for combo in (combo_option_type, combo_option_style):
+        combo.bind('<<ComboboxSelected>>', schedule_live_update)
 
-frame_plot_container.rowconfigure(0, weight=1)
-frame_plot_container.columnconfigure(0, weight=1)
+    # Configure grid weights for proper scaling
+    frame_option.columnconfigure(0, weight=1)
+    frame_option.columnconfigure(1, weight=2)
+    frame_option.rowconfigure(0, weight=1)
+
+    frame_plot_container.rowconfigure(0, weight=1)
+    frame_plot_container.columnconfigure(0, weight=1)
+
+    # Create the Monte Carlo calculator tab
+    frame_mc = ttk.Frame(notebook)
+    notebook.add(frame_mc, text="Monte Carlo 计算器")
+
+    # Create frames for Monte Carlo tab
+    frame_mc_inputs = ttk.Frame(frame_mc)
+    frame_mc_inputs.grid(row=0, column=0, padx=10, pady=10, sticky=tk.N+tk.S+tk.W)
 
-# Create the Monte Carlo calculator tab
-frame_mc = ttk.Frame(notebook)
-notebook.add(frame_mc, text="Monte Carlo 计算器")
+    # Add Monte Carlo input fields
+    label_S_mc = ttk.Label(frame_mc_inputs, text="股票价格 (S):")
+    entry_S_mc = ttk.Entry(frame_mc_inputs)
+    entry_S_mc.insert(0, "100")
 
-# Create frames for Monte Carlo tab
-frame_mc_inputs = ttk.Frame(frame_mc)
-frame_mc_inputs.grid(row=0, column=0, padx=10, pady=10, sticky=tk.N+tk.S+tk.W)
+    label_K_mc = ttk.Label(frame_mc_inputs, text="执行价格 (K):")
+    entry_K_mc = ttk.Entry(frame_mc_inputs)
+    entry_K_mc.insert(0, "100")
 
-# Add Monte Carlo input fields
-label_S_mc = ttk.Label(frame_mc_inputs, text="股票价格 (S):")
-entry_S_mc = ttk.Entry(frame_mc_inputs)
-entry_S_mc.insert(0, "100")
+    label_T_mc = ttk.Label(frame_mc_inputs, text="到期时间 (T) 年:")
+    entry_T_mc = ttk.Entry(frame_mc_inputs)
+    entry_T_mc.insert(0, "1")
 
-label_K_mc = ttk.Label(frame_mc_inputs, text="执行价格 (K):")
-entry_K_mc = ttk.Entry(frame_mc_inputs)
-entry_K_mc.insert(0, "100")
+    label_r_mc = ttk.Label(frame_mc_inputs, text="无风险利率 (%) :")
+    entry_r_mc = ttk.Entry(frame_mc_inputs)
+    entry_r_mc.insert(0, "5")
 
-label_T_mc = ttk.Label(frame_mc_inputs, text="到期时间 (T) 年:")
-entry_T_mc = ttk.Entry(frame_mc_inputs)
-entry_T_mc.insert(0, "1")
+    label_sigma_mc = ttk.Label(frame_mc_inputs, text="波动率 (%) :")
+    entry_sigma_mc = ttk.Entry(frame_mc_inputs)
+    entry_sigma_mc.insert(0, "20")
 
-label_r_mc = ttk.Label(frame_mc_inputs, text="无风险利率 (%) :")
-entry_r_mc = ttk.Entry(frame_mc_inputs)
-entry_r_mc.insert(0, "5")
+    label_n_sims = ttk.Label(frame_mc_inputs, text="模拟次数:")
+    entry_n_sims = ttk.Entry(frame_mc_inputs)
+    entry_n_sims.insert(0, "10000")
 
-label_sigma_mc = ttk.Label(frame_mc_inputs, text="波动率 (%) :")
-entry_sigma_mc = ttk.Entry(frame_mc_inputs)
-entry_sigma_mc.insert(0, "20")
+    var_option_type_mc = tk.StringVar(value="call")
+    var_option_style_mc = tk.StringVar(value="vanilla")
 
-label_n_sims = ttk.Label(frame_mc_inputs, text="模拟次数:")
-entry_n_sims = ttk.Entry(frame_mc_inputs)
-entry_n_sims.insert(0, "10000")
+    label_option_type_mc = ttk.Label(frame_mc_inputs, text="Option Type:")
+    combo_option_type_mc = ttk.Combobox(frame_mc_inputs, textvariable=var_option_type_mc, state="readonly")
+    combo_option_type_mc['values'] = ("call", "put")
+    combo_option_type_mc.current(0)
 
-var_option_type_mc = tk.StringVar(value="call")
-var_option_style_mc = tk.StringVar(value="vanilla")
+    label_option_style_mc = ttk.Label(frame_mc_inputs, text="Option Style:")
+    combo_option_style_mc = ttk.Combobox(frame_mc_inputs, textvariable=var_option_style_mc, state="readonly")
+    combo_option_style_mc['values'] = ("vanilla", "digital")
+    combo_option_style_mc.current(0)
 
-label_option_type_mc = ttk.Label(frame_mc_inputs, text="Option Type:")
-combo_option_type_mc = ttk.Combobox(frame_mc_inputs, textvariable=var_option_type_mc, state="readonly")
-combo_option_type_mc['values'] = ("call", "put")
-combo_option_type_mc.current(0)
+    button_calculate_mc = ttk.Button(frame_mc_inputs, text="计算", command=calculate_monte_carlo)
+    button_cancel_mc = ttk.Button(frame_mc_inputs, text="取消", command=cancel_monte_carlo, state="disabled")
+    progress_mc = ttk.Progressbar(frame_mc_inputs, orient=tk.HORIZONTAL, mode="determinate")
+    label_progress_mc = ttk.Label(frame_mc_inputs, text="")
 
-label_option_style_mc = ttk.Label(frame_mc_inputs, text="Option Style:")
-combo_option_style_mc = ttk.Combobox(frame_mc_inputs, textvariable=var_option_style_mc, state="readonly")
-combo_option_style_mc['values'] = ("vanilla", "digital")
-combo_option_style_mc.current(0)
+    label_price_mc = ttk.Label(frame_mc_inputs, text="Monte Carlo Price: ")
+    label_analytical_mc = ttk.Label(frame_mc_inputs, text="Analytical Price: ")
 
-button_calculate_mc = ttk.Button(frame_mc_inputs, text="计算", command=calculate_monte_carlo)
+    # Add new labels for Greeks in Monte Carlo tab
+    label_delta_mc = ttk.Label(frame_mc_inputs, text="Delta: ")
+    label_gamma_mc = ttk.Label(frame_mc_inputs, text="Gamma: ")
+    label_vega_mc = ttk.Label(frame_mc_inputs, text="Vega: ")
+    label_theta_mc = ttk.Label(frame_mc_inputs, text="Theta: ")
+    label_rho_mc = ttk.Label(frame_mc_inputs, text="Rho: ")
 
-label_price_mc = ttk.Label(frame_mc_inputs, text="Monte Carlo Price: ")
-label_analytical_mc = ttk.Label(frame_mc_inputs, text="Analytical Price: ")
+    # Layout Monte Carlo inputs
+    label_S_mc.grid(row=0, column=0, padx=10, pady=5, sticky=tk.W)
+    entry_S_mc.grid(row=0, column=1, padx=10, pady=5)
 
-# Add new labels for Greeks in Monte Carlo tab
-label_delta_mc = ttk.Label(frame_mc_inputs, text="Delta: ")
-label_gamma_mc = ttk.Label(frame_mc_inputs, text="Gamma: ")
-label_vega_mc = ttk.Label(frame_mc_inputs, text="Vega: ")
-label_theta_mc = ttk.Label(frame_mc_inputs, text="Theta: ")
-label_rho_mc = ttk.Label(frame_mc_inputs, text="Rho: ")
+    label_K_mc.grid(row=1, column=0, padx=10, pady=5, sticky=tk.W)
+    entry_K_mc.grid(row=1, column=1, padx=10, pady=5)
 
-# Layout Monte Carlo inputs
-label_S_mc.grid(row=0, column=0, padx=10, pady=5, sticky=tk.W)
-entry_S_mc.grid(row=0, column=1, padx=10, pady=5)
+    label_T_mc.grid(row=2, column=0, padx=10, pady=5, sticky=tk.W)
+    entry_T_mc.grid(row=2, column=1, padx=10, pady=5)
 
-label_K_mc.grid(row=1, column=0, padx=10, pady=5, sticky=tk.W)
-entry_K_mc.grid(row=1, column=1, padx=10, pady=5)
+    label_r_mc.grid(row=3, column=0, padx=10, pady=5, sticky=tk.W)
+    entry_r_mc.grid(row=3, column=1, padx=10, pady=5)
 
-label_T_mc.grid(row=2, column=0, padx=10, pady=5, sticky=tk.W)
-entry_T_mc.grid(row=2, column=1, padx=10, pady=5)
+    label_sigma_mc.grid(row=4, column=0, padx=10, pady=5, sticky=tk.W)
+    entry_sigma_mc.grid(row=4, column=1, padx=10, pady=5)
 
-label_r_mc.grid(row=3, column=0, padx=10, pady=5, sticky=tk.W)
-entry_r_mc.grid(row=3, column=1, padx=10, pady=5)
+    label_n_sims.grid(row=5, column=0, padx=10, pady=5, sticky=tk.W)
+    entry_n_sims.grid(row=5, column=1, padx=10, pady=5)
 
-label_sigma_mc.grid(row=4, column=0, padx=10, pady=5, sticky=tk.W)
-entry_sigma_mc.grid(row=4, column=1, padx=10, pady=5)
+    label_option_type_mc.grid(row=6, column=0, padx=10, pady=5, sticky=tk.W)
+    combo_option_type_mc.grid(row=6, column=1, padx=10, pady=5, sticky=tk.W)
 
-label_n_sims.grid(row=5, column=0, padx=10, pady=5, sticky=tk.W)
-entry_n_sims.grid(row=5, column=1, padx=10, pady=5)
+    label_option_style_mc.grid(row=7, column=0, padx=10, pady=5, sticky=tk.W)
+    combo_option_style_mc.grid(row=7, column=1, padx=10, pady=5, sticky=tk.W)
 
-label_option_type_mc.grid(row=6, column=0, padx=10, pady=5, sticky=tk.W)
-combo_option_type_mc.grid(row=6, column=1, padx=10, pady=5, sticky=tk.W)
+    button_calculate_mc.grid(row=8, column=0, pady=20)
+    button_cancel_mc.grid(row=8, column=1, pady=20)
+    progress_mc.grid(row=9, columnspan=2, padx=10, sticky=tk.W+tk.E)
+    label_progress_mc.grid(row=10, columnspan=2, pady=5)
 
-label_option_style_mc.grid(row=7, column=0, padx=10, pady=5, sticky=tk.W)
-combo_option_style_mc.grid(row=7, column=1, padx=10, pady=5, sticky=tk.W)
+    label_price_mc.grid(row=11, columnspan=2, pady=10)
+    label_delta_mc.grid(row=12, columnspan=2, pady=10)
+    label_gamma_mc.grid(row=13, columnspan=2, pady=10)
+    label_vega_mc.grid(row=14, columnspan=2, pady=10)
+    label_theta_mc.grid(row=15, columnspan=2, pady=10)
+    label_rho_mc.grid(row=16, columnspan=2, pady=10)
 
-button_calculate_mc.grid(row=8, columnspan=2, pady=20)
+    def on_closing():
+        root.destroy()
+        sys.exit(0)
 
-label_price_mc.grid(row=9, columnspan=2, pady=10)
-label_delta_mc.grid(row=10, columnspan=2, pady=10)
-label_gamma_mc.grid(row=11, columnspan=2, pady=10)
-label_vega_mc.grid(row=12, columnspan=2, pady=10)
-label_theta_mc.grid(row=13, columnspan=2, pady=10)
-label_rho_mc.grid(row=14, columnspan=2, pady=10)
+    # Handle window close event to properly terminate the program
+    root.protocol("WM_DELETE_WINDOW", on_closing)
 
-def on_closing():
-    root.destroy()
-    sys.exit(0)
+    # Run the main loop
+    root.mainloop()
 
-# Handle window close event to properly terminate the program
-root.protocol("WM_DELETE_WINDOW", on_closing)
 
-# Run the main loop
-root.mainloop()
+if __name__ == '__main__':
+    main()
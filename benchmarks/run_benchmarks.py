@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark suite for the pricing, simulation and curve engines.
+
+    python benchmarks/run_benchmarks.py                 # compare with baseline.json
+    python benchmarks/run_benchmarks.py --save          # record a new baseline
+    python benchmarks/run_benchmarks.py --only mc_      # run a subset (regular expression)
+
+Each benchmark reports its throughput (items per second, best of `repeat`
+timed runs after one warm-up) and the peak memory traced by tracemalloc in
+a separate run, numpy buffers included. A benchmark fails when its
+throughput drops more than `threshold` below the baseline, or its peak
+memory grows more than `threshold` (plus 1 MB of slack) above it; the exit
+status is then 1.
+
+Baselines depend on the machine: record one with --save on the machine that
+runs the comparison. The machine description is stored next to the numbers.
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import sys
+import tracemalloc
+from time import perf_counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'GUI'))
+import numpy as np
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# name -> (unit, setup); setup() returns (items per run, function running one timed run)
+BENCHMARKS = {}
+
+
+def benchmark(name, unit):
+    """Register `setup` under `name`; its throughput is reported in `unit`."""
+    def register(setup):
+        BENCHMARKS[name] = (unit, setup)
+        return setup
+    return register
+
+
+def _book(n, seed=0):
+    rng = np.random.default_rng(seed)
+    S = rng.uniform(50, 150, n)
+    K = rng.uniform(50, 150, n)
+    T = rng.uniform(0.05, 3.0, n)
+    sigma = rng.uniform(0.05, 0.8, n)
+    is_call = rng.random(n) < 0.5
+    return S, K, T, sigma, is_call
+
+
+@benchmark('bs_scalar_greeks', 'options/s')
+def bs_scalar_greeks():
+    from quant.black_scholes import BS
+    S, K, T, sigma, is_call = _book(2000)
+    rows = [('C' if c else 'P', s, k, t, 0.03, v, 0.0) for s, k, t, v, c in
+            zip(S.tolist(), K.tolist(), T.tolist(), sigma.tolist(), is_call.tolist())]
+
+    def run():
+        for row in rows:
+            option = BS(*row)
+            option.BSM(), option.Delta(), option.Gamma(), option.Vega(), option.Theta(), option.Rho()
+    return len(rows), run
+
+
+@benchmark('bs_chain', 'options/s')
+def bs_chain():
+    from quant.black_scholes import BS_chain
+    S, K, T, sigma, is_call = _book(1000000)
+    return S.size, lambda: BS_chain(S, K, T, 0.03, sigma, 0.01, is_call)
+
+
+@benchmark('bs_chain_float32', 'options/s')
+def bs_chain_float32():
+    from quant.black_scholes import BS_chain
+    S, K, T, sigma, is_call = _book(1000000)
+    return S.size, lambda: BS_chain(S, K, T, 0.03, sigma, 0.01, is_call, np.float32)
+
+
+@benchmark('portfolio_revaluation', 'positions/s')
+def portfolio_revaluation():
+    from quant.portfolio import Portfolio
+    rng = np.random.default_rng(0)
+    n = 500000
+    # 20 underlyings x 12 expiries x 41 strikes: positions share contracts, as in a real book
+    spots = rng.uniform(20, 500, 20)
+    u = rng.integers(0, spots.size, n)
+    T = (np.array([1, 2, 3, 6, 9, 12, 18, 24, 36, 48, 60, 120]) / 12)[rng.integers(0, 12, n)]
+    K = np.round(spots[u] * np.linspace(0.6, 1.4, 41)[rng.integers(0, 41, n)], 2)
+    portfolio = Portfolio(u, K, T, rng.random(n) < 0.5, rng.integers(-50, 51, n) * 100.0, rng.integers(0, 3, n))
+    sigma = rng.uniform(0.1, 0.4, portfolio.n_contracts)
+    return n, lambda: portfolio.price(spots, sigma, 0.03)
+
+
+@benchmark('scenario_ladder', 'prices/s')
+def scenario_ladder():
+    from quant.scenarios import scenario_ladder
+    S, K, T, sigma, is_call = _book(10000)
+    spot_shocks, vol_shocks = np.linspace(-0.2, 0.2, 21), np.linspace(-0.1, 0.1, 11)
+    return S.size * spot_shocks.size * vol_shocks.size, lambda: scenario_ladder(
+        S, K, T, sigma, is_call, 1.0, 0.03, 0.0, None, spot_shocks, vol_shocks, 1 / 365)
+
+
+@benchmark('live_book_ticks', 'batches/s')
+def live_book_ticks():
+    from quant.live_book import LiveBook
+    S, K, T, sigma, is_call = _book(100000)
+    underlying = np.random.default_rng(1).integers(0, 500, S.size)
+    spots = np.random.default_rng(2).uniform(50, 150, 500)
+    book = LiveBook(underlying, spots[underlying], K, T, sigma, is_call, 1.0, 0.03)
+    # 200 batches of 5 spot ticks each, about 1000 contracts repriced per batch
+    ticked = [np.arange(i, 500, 100) for i in range(100)] * 2
+    ticks = [(names, spots[names] * 1.001) for names in ticked]
+
+    def run():
+        for names, new_spots in ticks:
+            book.tick(names, new_spots)
+            book.update()
+    return len(ticks), run
+
+
+@benchmark('implied_vol_scalar', 'options/s')
+def implied_vol_scalar():
+    from quant.black_scholes import BS, Implied_vol
+    # near-the-money quotes: the plain Newton iteration of Implied_vol diverges far from the money
+    rng = np.random.default_rng(0)
+    S = rng.uniform(50, 150, 500)
+    K = S * rng.uniform(0.9, 1.1, S.size)
+    T = rng.uniform(0.25, 2.0, S.size)
+    sigma = rng.uniform(0.1, 0.4, S.size)
+    rows = []
+    for s, k, t, v in zip(S.tolist(), K.tolist(), T.tolist(), sigma.tolist()):
+        rows.append((Implied_vol('C', s, k, t, 0.03, 0.0), BS('C', s, k, t, 0.03, v, 0.0).BSM()))
+
+    def run():
+        for solver, price in rows:
+            solver.implied_vol(price)
+    return len(rows), run
+
+
+@benchmark('implied_vol_chain', 'options/s')
+def implied_vol_chain():
+    from quant.black_scholes import BS_chain, Implied_vol_chain
+    S, K, T, sigma, is_call = _book(200000)
+    prices = BS_chain(S, K, T, 0.03, sigma, 0.01, is_call).price
+    return S.size, lambda: Implied_vol_chain(prices, S, K, T, 0.03, 0.01, is_call)
+
+
+@benchmark('mc_plain', 'paths/s')
+def mc_plain():
+    from quant.bsm import monte_carlo_option_pricing
+    M = 2000000
+    rng = np.random.default_rng(0)
+    return M, lambda: monte_carlo_option_pricing(100.0, 100.0, 1.0, 0.03, 0.2, M, 'call', rng=rng)
+
+
+@benchmark('mc_plain_float32', 'paths/s')
+def mc_plain_float32():
+    from quant.bsm import monte_carlo_option_pricing
+    M = 2000000
+    rng = np.random.default_rng(0)
+    return M, lambda: monte_carlo_option_pricing(100.0, 100.0, 1.0, 0.03, 0.2, M, 'call', rng=rng,
+                                                 dtype=np.float32)
+
+
+@benchmark('mc_control_variate', 'paths/s')
+def mc_control_variate():
+    from quant.bsm import monte_carlo_option_pricing
+    M = 2000000
+    rng = np.random.default_rng(0)
+    return M, lambda: monte_carlo_option_pricing(100.0, 100.0, 1.0, 0.03, 0.2, M, 'call',
+                                                 method='control_variate', rng=rng)
+
+
+@benchmark('mc_path_dependent_asian', 'path-steps/s')
+def mc_path_dependent_asian():
+    from quant.path_dependent import path_dependent_option_pricing
+    M, n_steps = 100000, 52
+    rng = np.random.default_rng(0)
+    return M * n_steps, lambda: path_dependent_option_pricing(100.0, 100.0, 1.0, 0.03, 0.2, M, n_steps,
+                                                              'asian_call', rng=rng)
+
+
+@benchmark('gui_monte_carlo_simulation', 'paths/s')
+def gui_monte_carlo_simulation():
+    from Combined_Option_Calculator import monte_carlo_simulation
+    n_sims = 1000000
+    rng = np.random.default_rng(0)
+    return n_sims, lambda: monte_carlo_simulation(100.0, 100.0, 1.0, 0.03, 0.2, 'call', 'vanilla', n_sims, rng)
+
+
+@benchmark('gui_monte_carlo_simulation_float32', 'paths/s')
+def gui_monte_carlo_simulation_float32():
+    from Combined_Option_Calculator import monte_carlo_simulation
+    n_sims = 1000000
+    rng = np.random.default_rng(0)
+    return n_sims, lambda: monte_carlo_simulation(100.0, 100.0, 1.0, 0.03, 0.2, 'call', 'vanilla', n_sims, rng,
+                                                  np.float32)
+
+
+@benchmark('ns_curves', 'curve points/s')
+def ns_curves():
+    from quant.Nelson_Siegel import NS
+    m = np.linspace(0.1, 30, 360)
+    betas = np.random.default_rng(0).normal([0.04, -0.02, 0.01], 0.005, (5000, 3))
+    return betas.shape[0] * m.size, lambda: NS(betas[:, :1], betas[:, 1:2], betas[:, 2:], 2.0, m)
+
+
+@benchmark('sv_curves', 'curve points/s')
+def sv_curves():
+    from quant.NSS import SV
+    m = np.linspace(0.1, 30, 360)
+    betas = np.random.default_rng(0).normal([0.04, -0.02, 0.01, 0.015], 0.005, (5000, 4))
+    return betas.shape[0] * m.size, lambda: SV(betas[:, :1], betas[:, 1:2], betas[:, 2:3], betas[:, 3:],
+                                              1.5, 9.0, m)
+
+
+@benchmark('cir_euler', 'path-steps/s')
+def cir_euler():
+    from quant.cir import simulate_cir_euler
+    M, n_steps = 200000, 250
+    rng = np.random.default_rng(0)
+    return M * n_steps, lambda: simulate_cir_euler(0.04, 0.2, 0.05, 0.1, 0.25, n_steps, M, rng)
+
+
+@benchmark('cir_exact', 'paths/s')
+def cir_exact():
+    from quant.cir import simulate_cir_exact
+    M = 1000000
+    rng = np.random.default_rng(0)
+    return M, lambda: simulate_cir_exact(0.04, 0.2, 0.05, 0.1, 0.25, M, 1, rng)
+
+
+@benchmark('jit_implied_vol', 'options/s')
+def jit_implied_vol():
+    # jit_kernels runs on numba when it is installed, on numpy otherwise: compare baselines per backend
+    from quant import jit_kernels
+    from quant.black_scholes import BS_chain
+    S, K, T, sigma, is_call = _book(200000)
+    prices = BS_chain(S, K, T, 0.03, sigma, 0.01, is_call).price
+    return S.size, lambda: jit_kernels.implied_vol(prices, S, K, T, 0.03, 0.01, is_call)
+
+
+@benchmark('jit_gbm_path_average', 'path-steps/s')
+def jit_gbm_path_average():
+    from quant import jit_kernels
+    z = np.random.default_rng(0).standard_normal((20000, 250))
+    return z.size, lambda: jit_kernels.gbm_path_average(100.0, 0.03, 0.2, 1.0, z)
+
+
+@benchmark('jit_cir_euler_paths', 'path-steps/s')
+def jit_cir_euler_paths():
+    from quant import jit_kernels
+    z = np.random.default_rng(0).standard_normal((20000, 250))
+    return z.size, lambda: jit_kernels.cir_euler_paths(0.04, 0.2, 0.05, 0.1, 0.25, z)
+
+
+def measure(setup, repeat=3):
+    """Throughput (items/s, best of `repeat`) and traced peak memory in MB of one benchmark."""
+    n_items, run = setup()
+    run()  # warm-up: first-call imports and caches are not part of the measurement
+    best = float('inf')
+    for i in range(repeat):
+        t0 = perf_counter()
+        run()
+        best = min(best, perf_counter() - t0)
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return n_items / best, peak / 2**20
+
+
+def machine():
+    from quant import jit_kernels
+    return {'platform': platform.platform(), 'python': platform.python_version(),
+            'numpy': np.__version__, 'cpu_count': os.cpu_count(), 'jit_backend': jit_kernels.get_backend()}
+
+
+def compare(results, baseline, threshold):
+    """Names of the benchmarks that regressed against the baseline, with a reason each."""
+    failures = {}
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        if result['throughput'] < reference['throughput'] * (1 - threshold):
+            failures[name] = "throughput %.0f%% of baseline" % (100 * result['throughput'] / reference['throughput'])
+        elif result['peak_mb'] > reference['peak_mb'] * (1 + threshold) + 1.0:
+            failures[name] = "peak memory %.1f MB vs %.1f MB" % (result['peak_mb'], reference['peak_mb'])
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the benchmark suite and compare it with a baseline.")
+    parser.add_argument('--only', default='', help="run the benchmarks whose name matches this regular expression")
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per benchmark (default 3)")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="allowed relative regression (default 0.25)")
+    parser.add_argument('--baseline', default=BASELINE, help="baseline JSON file")
+    parser.add_argument('--save', action='store_true', help="write the results as the new baseline")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)['benchmarks']
+    results = {}
+    for name, (unit, setup) in BENCHMARKS.items():
+        if not re.search(args.only, name):
+            continue
+        throughput, peak_mb = measure(setup, args.repeat)
+        results[name] = {'throughput': throughput, 'unit': unit, 'peak_mb': peak_mb}
+        reference = baseline.get(name)
+        change = " (%+5.1f%%)" % (100 * (throughput / reference['throughput'] - 1)) if reference else ""
+        print(f"{name:36s} {throughput:12.4g} {unit:15s}{change:10s} peak {peak_mb:8.1f} MB")
+
+    if args.save:
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump({'machine': machine(), 'benchmarks': baseline}, f, indent=2, sort_keys=True)
+        print("baseline written to", args.baseline)
+        return 0
+    failures = compare(results, baseline, args.threshold)
+    for name, reason in failures.items():
+        print(f"REGRESSION {name}: {reason}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
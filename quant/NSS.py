@@ -24,3 +24,28 @@ def SV(beta0, beta1, beta2, beta3, tau1, tau2, m):
     # Calculate the forward rate using the Svensson model formula
     forward = beta0 + beta1 * exp1 + beta2 * k1 * exp1 + beta3 * k2 * exp2
     return [spot, forward]  # Return the spot rate and forward rate as a list
+
+
+def SV_loadings(tau1, tau2, m):
+    '''
+    Factor loadings of the Svensson spot and forward curves.
+
+    For fixed tau1 and tau2 both curves are linear in the betas:
+    spot = spot_loadings @ [beta0, beta1, beta2, beta3], and likewise for the forward rate.
+
+    :param tau1: Decay factor for the first exponential term. Broadcast against m.
+    :param tau2: Decay factor for the second exponential term. Broadcast against m.
+    :param m: Maturities. Array or number, can't be zero.
+    :return: Tuple (spot_loadings, forward_loadings), each with the broadcast shape of
+        tau1, tau2 and m plus a trailing axis of length 4.
+    '''
+    k1 = np.asarray(m, dtype=float) / tau1
+    k2 = np.asarray(m, dtype=float) / tau2
+    k1, k2 = np.broadcast_arrays(k1, k2)
+    exp1 = np.exp(-k1)
+    exp2 = np.exp(-k2)
+    slope1 = (1 - exp1) / k1
+    ones = np.ones_like(k1)
+    spot_loadings = np.stack([ones, slope1, slope1 - exp1, (1 - exp2) / k2 - exp2], axis=-1)
+    forward_loadings = np.stack([ones, exp1, k1 * exp1, k2 * exp2], axis=-1)
+    return spot_loadings, forward_loadings
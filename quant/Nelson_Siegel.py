@@ -60,3 +60,30 @@ def NS(beta0, beta1, beta2, lambda0, m):
     forward = beta0 + beta1 * exp_neg_k + beta2 * k * exp_neg_k
 
     return [spot, forward]
+
+
+def NS_loadings(lambda0, m):
+    """
+    Factor loadings of the Nelson-Siegel spot and forward curves.
+
+    The spot and forward rates are linear in the betas for a fixed decay
+    factor: spot = spot_loadings @ [beta0, beta1, beta2], and likewise for
+    the forward rate. Fitting the betas for a given lambda0 is therefore a
+    linear least-squares problem.
+
+    Parameters:
+    lambda0 (float or array-like): The decay factor. Broadcast against m, e.g. a
+        column of decay factors against a row of maturities.
+    m (float or array-like): The maturity or maturities. Must be positive.
+
+    Returns:
+    tuple: (spot_loadings, forward_loadings), each with the broadcast shape of
+    lambda0 and m plus a trailing axis of length 3.
+    """
+    k = np.asarray(m, dtype=float) / lambda0
+    exp_neg_k = np.exp(-k)
+    slope = (1 - exp_neg_k) / k
+    ones = np.ones_like(k)
+    spot_loadings = np.stack([ones, slope, slope - exp_neg_k], axis=-1)
+    forward_loadings = np.stack([ones, exp_neg_k, k * exp_neg_k], axis=-1)
+    return spot_loadings, forward_loadings
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Single import point for the pricing, simulation and curve modules.
+
+    import quant
+    greeks = quant.BS_chain(100.0, K, T, 0.03, 0.2)
+
+Importing the package runs no computation and imports nothing beyond the
+standard library: each name below is resolved on first attribute access,
+which imports only the module that defines it (and numpy). scipy is loaded
+by special_functions on the first array normal CDF, and matplotlib only by
+the GUI, so a short-lived pricing worker pays for what it actually uses.
+
+The implementation modules are submodules of the package and import each
+other relatively, so they also work on their own (from quant.bsm import
+...), which the GUI and benchmarks do; their demos run with python -m, e.g.
+python -m quant.portfolio.
+"""
+import importlib
+
+# public name -> defining module
+_EXPORTS = {
+    'BS': 'black_scholes',
+    'Implied_vol': 'black_scholes',
+    'BS_chain': 'black_scholes',
+    'ChainGreeks': 'black_scholes',
+    'Implied_vol_chain': 'black_scholes',
+    'IV_CONVERGED': 'black_scholes',
+    'IV_MAX_ITERATION': 'black_scholes',
+    'IV_OUT_OF_BOUNDS': 'black_scholes',
+    'MCResult': 'bsm',
+    'option_payoff': 'bsm',
+    'monte_carlo_option_pricing': 'bsm',
+    'monte_carlo_option_pricing_streaming': 'bsm',
+    'monte_carlo_option_pricing_parallel': 'bsm',
+    'BSMAnalytical': 'bsm',
+    'BS_vega': 'bsm',
+    'implied_vol': 'bsm',
+    'check_dtype': 'bsm',
+    'standard_normal': 'bsm',
+    'path_dependent_option_pricing': 'path_dependent',
+    'RunningStats': 'running_stats',
+    'norm_cdf': 'special_functions',
+    'norm_pdf': 'special_functions',
+    'set_backend': 'special_functions',
+    'get_backend': 'special_functions',
+    'simulate_cir_euler': 'cir',
+    'simulate_cir_exact': 'cir',
+    'cir_validation_report': 'cir',
+    'NS': 'Nelson_Siegel',
+    'NS_loadings': 'Nelson_Siegel',
+    'SV': 'NSS',
+    'SV_loadings': 'NSS',
+    'CurveFit': 'curve_calibration',
+    'calibrate_NS': 'curve_calibration',
+    'calibrate_SV': 'curve_calibration',
+    'LoadingCache': 'yield_curve',
+    'CurveEvaluator': 'yield_curve',
+    'TermStructure': 'yield_curve',
+    'VolSurface': 'vol_surface',
+    'build_vol_surface': 'vol_surface',
+    'svi_total_variance': 'vol_surface',
+    'fit_svi': 'vol_surface',
+    'CRNStore': 'crn_store',
+    'Portfolio': 'portfolio',
+    'PortfolioRisk': 'portfolio',
+    'price_portfolio': 'portfolio',
+    'ScenarioResult': 'scenarios',
+    'scenario_ladder': 'scenarios',
+    'LiveBook': 'live_book',
+    'BatchStats': 'live_book',
+    'BookRun': 'batch_pricing',
+    'price_book': 'batch_pricing',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    value = getattr(importlib.import_module('.' + module, __name__), name)
+    # cache on the package so later lookups are plain attribute reads
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
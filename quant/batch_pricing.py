@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+Headless batch pricing of a book of European options.
+
+    python -m quant.batch_pricing trades.csv priced.csv --chunk-size 200000 --workers 8
+
+The trade file is read in chunks of `chunk_size` rows, every chunk is priced
+with BS_chain in a process pool and the results are appended to the output
+file in input order, so memory stays O(chunk_size * in-flight chunks)
+whatever the size of the book. Nothing here imports Tk or matplotlib.
+
+Input columns: S, K, T, r, sigma and optionally q (default 0) and type
+('call'/'put' or 'C'/'P', default call). Every input column is copied to the
+output, followed by price, delta, gamma, vega, theta and rho.
+
+CSV and Parquet (.parquet/.pq) are supported for input and output. CSV goes
+through pandas when it is installed and through the csv module otherwise;
+Parquet needs pyarrow. Both are only imported once a file is read or
+written, so importing this module stays cheap.
+"""
+import argparse
+import csv
+import os
+import sys
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from time import perf_counter
+import numpy as np
+from .black_scholes import BS_chain, ChainGreeks
+
+REQUIRED_COLUMNS = ('S', 'K', 'T', 'r', 'sigma')
+PARQUET_EXTENSIONS = ('.parquet', '.pq')
+
+BookRun = namedtuple('BookRun', ['rows', 'wall_time', 'rows_per_second', 'peak_rss_mb'])
+
+
+def price_book(input_path, output_path, chunk_size=100000, n_workers=None):
+    """
+    Price every row of a trade file and stream the results to output_path.
+
+    Parameters:
+    input_path, output_path : str
+        CSV or Parquet files, chosen by extension.
+    chunk_size : int, optional
+        Number of rows read, priced and written at a time. Default is 100000.
+    n_workers : int, optional
+        Number of pricing processes. Default is os.cpu_count(); 1 prices in-process.
+
+    Returns:
+    BookRun
+        Number of rows, wall time, throughput and the peak resident set size
+        in MB of the largest process (parent or worker), see peak_rss_mb.
+    """
+    t0 = perf_counter()
+    if n_workers is None:
+        n_workers = os.cpu_count()
+    rows = 0
+    writer = _open_writer(output_path)
+    try:
+        if n_workers == 1:
+            for chunk in _read_chunks(input_path, chunk_size):
+                writer.write(_merge_results(chunk, price_chunk(_pricing_inputs(chunk))))
+                rows += len(chunk[REQUIRED_COLUMNS[0]])
+        else:
+            with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                # at most two chunks per worker in flight, written back in submission order
+                pending = deque()
+                for chunk in _read_chunks(input_path, chunk_size):
+                    pending.append((chunk, pool.submit(price_chunk, _pricing_inputs(chunk))))
+                    if len(pending) >= 2 * n_workers:
+                        done, future = pending.popleft()
+                        writer.write(_merge_results(done, future.result()))
+                        rows += len(done[REQUIRED_COLUMNS[0]])
+                while pending:
+                    done, future = pending.popleft()
+                    writer.write(_merge_results(done, future.result()))
+                    rows += len(done[REQUIRED_COLUMNS[0]])
+    finally:
+        writer.close()
+    wall_time = perf_counter() - t0
+    return BookRun(rows, wall_time, rows / wall_time if wall_time > 0 else float('inf'), peak_rss_mb())
+
+
+def price_chunk(inputs):
+    """Price one chunk; inputs is the tuple built by _pricing_inputs. Returns an (n, 6) array."""
+    S, K, T, r, sigma, q, is_call = inputs
+    greeks = BS_chain(S, K, T, r, sigma, q, is_call)
+    return np.column_stack(greeks)
+
+
+def peak_rss_mb():
+    """
+    Peak resident set size in MB of this process and of its largest finished child.
+
+    The resource module is Unix only. Elsewhere the peak of this process alone
+    comes from psutil when it is installed, and None is returned otherwise.
+    """
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        info = psutil.Process().memory_info()
+        # peak_wset is the Windows peak working set
+        return getattr(info, 'peak_wset', info.rss) / 2**20
+    usage = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return usage / 2**20 if sys.platform == 'darwin' else usage / 2**10
+
+
+def generate_book(path, n_rows, seed=0, chunk_size=100000):
+    """Write a random book of n_rows calls and puts to path, e.g. to benchmark price_book."""
+    rng = np.random.default_rng(seed)
+    writer = _open_writer(path)
+    try:
+        for start in range(0, n_rows, chunk_size):
+            size = min(chunk_size, n_rows - start)
+            writer.write({
+                'trade_id': np.arange(start, start + size),
+                'S': rng.uniform(50, 150, size).round(2),
+                'K': rng.uniform(50, 150, size).round(2),
+                'T': rng.uniform(0.02, 3.0, size).round(4),
+                'r': rng.uniform(0.0, 0.06, size).round(4),
+                'sigma': rng.uniform(0.05, 0.8, size).round(4),
+                'q': rng.uniform(0.0, 0.03, size).round(4),
+                'type': np.where(rng.random(size) < 0.5, 'call', 'put'),
+            })
+    finally:
+        writer.close()
+
+
+def _pricing_inputs(chunk):
+    # only the numeric pricing columns cross the process boundary
+    missing = [name for name in REQUIRED_COLUMNS if name not in chunk]
+    if missing:
+        raise ValueError("trade file is missing column(s): " + ", ".join(missing))
+    n_rows = len(chunk[REQUIRED_COLUMNS[0]])
+    S, K, T, r, sigma = (np.asarray(chunk[name], dtype=float) for name in REQUIRED_COLUMNS)
+    q = np.asarray(chunk['q'], dtype=float) if 'q' in chunk else np.zeros(n_rows)
+    if 'type' in chunk:
+        is_call = np.char.startswith(np.char.lower(np.asarray(chunk['type']).astype(str)), 'c')
+    else:
+        is_call = np.ones(n_rows, dtype=bool)
+    return S, K, T, r, sigma, q, is_call
+
+
+def _merge_results(chunk, results):
+    columns = dict(chunk)
+    for i, name in enumerate(ChainGreeks._fields):
+        columns[name] = results[:, i]
+    return columns
+
+
+def _pandas():
+    # pandas is optional and slow to import, so it is only loaded for file I/O
+    try:
+        import pandas
+    except ImportError:
+        return None
+    return pandas
+
+
+def _is_parquet(path):
+    return os.path.splitext(path)[1].lower() in PARQUET_EXTENSIONS
+
+
+def _read_chunks(path, chunk_size):
+    """Yield the file as dicts of column name -> array, chunk_size rows at a time."""
+    pd = None if _is_parquet(path) else _pandas()
+    if _is_parquet(path):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield {name: batch.column(i).to_numpy(zero_copy_only=False)
+                   for i, name in enumerate(batch.schema.names)}
+    elif pd is not None:
+        for frame in pd.read_csv(path, chunksize=chunk_size):
+            yield {name: frame[name].to_numpy() for name in frame.columns}
+    else:
+        with open(path, newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            while True:
+                rows = list(islice(reader, chunk_size))
+                if not rows:
+                    break
+                yield {name: np.array(column) for name, column in zip(header, zip(*rows))}
+
+
+def _open_writer(path):
+    if _is_parquet(path):
+        return _ParquetWriter(path)
+    return _CsvWriter(path)
+
+
+class _CsvWriter(object):
+    # writes the header with the first chunk, then appends rows
+    def __init__(self, path):
+        self._file = open(path, 'w', newline='')
+        self._header = True
+        self._pd = _pandas()
+
+    def write(self, columns):
+        if self._pd is not None:
+            self._pd.DataFrame(columns).to_csv(self._file, header=self._header, index=False)
+        else:
+            writer = csv.writer(self._file)
+            if self._header:
+                writer.writerow(columns.keys())
+            writer.writerows(zip(*[np.asarray(values).tolist() for values in columns.values()]))
+        self._header = False
+
+    def close(self):
+        self._file.close()
+
+
+class _ParquetWriter(object):
+    # one row group per chunk; the schema is taken from the first chunk
+    def __init__(self, path):
+        import pyarrow
+        import pyarrow.parquet as pq
+        self._pyarrow = pyarrow
+        self._pq = pq
+        self._path = path
+        self._writer = None
+
+    def write(self, columns):
+        table = self._pyarrow.Table.from_pydict({name: np.asarray(values) for name, values in columns.items()})
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self._path, table.schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Price a book of European options with Black-Scholes.")
+    parser.add_argument('input', help="trade file, .csv or .parquet")
+    parser.add_argument('output', help="priced file, .csv or .parquet")
+    parser.add_argument('--chunk-size', type=int, default=100000, help="rows per chunk (default 100000)")
+    parser.add_argument('--workers', type=int, default=None, help="pricing processes (default: all cores)")
+    parser.add_argument('--generate', type=int, metavar='N_ROWS',
+                        help="first write a random book of N_ROWS trades to the input path")
+    args = parser.parse_args(argv)
+    if args.generate:
+        generate_book(args.input, args.generate)
+    run = price_book(args.input, args.output, args.chunk_size, args.workers)
+    rss = "n/a" if run.peak_rss_mb is None else f"{run.peak_rss_mb:.0f} MB"
+    print(f"priced {run.rows} rows in {run.wall_time:.2f} s: {run.rows_per_second:,.0f} rows/s, peak RSS {rss}")
+
+
+if __name__ == '__main__':
+    main()
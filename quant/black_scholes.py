@@ -0,0 +1,332 @@
+# -*- coding: utf-8 -*-
+# @Time    : 13/4/2017 2:31 PM
+# @Author  : Shen Tao
+# @Site    :
+# @File    : BS.py
+# @Software: PyCharm
+from collections import namedtuple
+from .special_functions import norm_cdf as N, norm_pdf as n
+import numpy as np
+class BS(object):
+    def __init__(self,option_type, S, K, T, r, sigma, q):
+
+        vars = locals() # dict of local names
+        self.__dict__.update(vars) # __dict__ holds and object's attributes
+        del self.__dict__["self"] # don't need `self`
+        self.T_sqrt = np.sqrt(T)
+        self.d1 = (np.log(self.S / self.K) + ((r - q) + sigma ** 2 / 2) * T) / (self.sigma * self.T_sqrt)
+        self.d2 = self.d1 - sigma * np.sqrt(T)
+    def BSM(self):
+
+        if self.option_type == 'C':
+            return self.S * np.exp(-self.q * self.T) * N(self.d1) - self.K * np.exp(-self.r * self.T) * N(self.d2)
+        elif self.option_type=='P':
+            return self.K * np.exp(-self.r * self.T) * N(-self.d2) - self.S * np.exp(-self.q * self.T) * N(-self.d1)
+        else:
+            print('option type is not included')
+            return 0
+    def Vega(self):
+        return self.S * self.T_sqrt*n(self.d1)
+
+    def Delta(self):
+        if self.option_type == 'C':
+            return N(self.d1)
+        elif self.option_type == 'P':
+            return -N(-self.d1)
+        else:
+            print('option type is not included')
+            return 0
+    def Gamma(self):
+        if self.option_type == 'C' or self.option_type == 'P':
+            return n(self.d1)/(self.S*self.sigma*self.T_sqrt)
+        else:
+            print('option type is not included')
+            return 0
+
+    def Theta(self):
+        if self.option_type == 'C':
+            return -(self.S * self.sigma*  n(self.d1))/  (2 * self.T_sqrt) - self.r * self.K * np.exp(-self.r * self.T) * N( self.d2)
+        elif self.option_type == 'P':
+            return -(self.S * self.sigma * n(self.d1)) / (2 * self.T_sqrt) + self.r * self.K * np.exp(-self.r * self.T) * N(-self.d2)
+        else:
+            print('option type is not included')
+            return 0
+    def Rho(self):
+        if self.option_type == 'C':
+            return self.K*self.T*np.exp(-self.r*self.T)*N(self.d2)
+        elif self.option_type == 'P':
+            return -self.K * self.T * np.exp(-self.r * self.T) * N(-self.d2)
+        else:
+            print('option type is not included')
+            return 0
+class  Implied_vol(object):
+    def __init__(self,option_type, S, K, T, r, q):
+        vars = locals() # dict of local names
+        self.__dict__.update(vars) # __dict__ holds and object's attributes
+        del self.__dict__["self"] # don't need `self`
+        self.T_sqrt = np.sqrt(T)
+    def implied_vol(self,option_price,precision = 1.0e-5,max_iteration = 100):
+        self.sigma = 0.1
+        for i in range(max_iteration):
+            self.d1 =  (np.log(self.S / self.K) + ((self.r - self.q) + self.sigma ** 2 / 2) * self.T) / (self.sigma * self.T_sqrt)
+            self.d2 = self.d1 - self.sigma * self.T_sqrt
+            price = self.BSM()
+            diff = option_price - price  # our root
+            if (abs(diff) < precision):
+                # print i
+                return self.sigma
+            vega = self.Vega()
+            self.sigma = self.sigma + diff/vega # f(x) / f'(x)
+        # value wasn't found, return best guess so far
+        print('max_iteration exceeds, defaut max_iteration is 100')
+        return self.sigma
+    def BSM(self):
+
+        if self.option_type == 'C':
+            return self.S * np.exp(-self.q * self.T) * N(self.d1) - self.K * np.exp(-self.r * self.T) * N(self.d2)
+        elif self.option_type=='P':
+            return self.K * np.exp(-self.r * self.T) * N(-self.d2) - self.S * np.exp(-self.q * self.T) * N(-self.d1)
+        else:
+            print('option type is not included')
+            return 0
+    def Vega(self):
+        return self.S * self.T_sqrt * n(self.d1)
+
+
+ChainGreeks = namedtuple('ChainGreeks', ['price', 'delta', 'gamma', 'vega', 'theta', 'rho'])
+
+
+def BS_chain(S, K, T, r, sigma, q=0.0, is_call=True, dtype=np.float64):
+    """
+    Price a whole option chain and all its Greeks in one vectorized pass.
+
+    d1/d2, both discount factors and the normal CDF/PDF values are computed
+    once and shared between the price and every Greek, instead of once per
+    method call as in BS. Calls and puts are priced together through the
+    sign +1/-1 taken from the mask, so there is no branch on option type.
+
+    Parameters:
+    S, K, T, r, sigma, q : float or array_like
+        Spot, strike, time to expiry in years, risk-free rate, volatility and
+        dividend yield. All inputs are broadcast against each other. r may also
+        be a yield_curve.TermStructure, giving each expiry its own zero rate;
+        theta then uses the instantaneous forward rate at expiry.
+    is_call : bool or array_like of bool
+        True for calls, False for puts.
+    dtype : numpy float dtype, optional
+        Precision of every computation. np.float32 halves the memory traffic of
+        large grids at about 1e-6 relative accuracy. Default is np.float64.
+
+    Returns:
+    ChainGreeks
+        Struct-of-arrays with price, delta, gamma, vega, theta and rho.
+        With q=0 the values equal BS(...).BSM(), Delta(), ... elementwise;
+        with q>0 the dividend terms are included in every Greek.
+    """
+    r, r_forward = _curve_rates(r, T)
+    S, K, T, r, r_forward, sigma, q = np.broadcast_arrays(
+        *[np.asarray(x, dtype=dtype) for x in (S, K, T, r, r_forward, sigma, q)])
+    sign = np.where(is_call, 1.0, -1.0).astype(dtype)
+    T_sqrt = np.sqrt(T)
+    sigma_T_sqrt = sigma * T_sqrt
+    d1 = (np.log(S / K) + (r - q + 0.5 * sigma ** 2) * T) / sigma_T_sqrt
+    d2 = d1 - sigma_T_sqrt
+    # shared intermediates: discounted spot/strike and the three distribution values
+    S_disc = S * np.exp(-q * T)
+    K_disc = K * np.exp(-r * T)
+    N_d1 = N(sign * d1)
+    N_d2 = N(sign * d2)
+    n_d1 = n(d1)
+
+    price = sign * (S_disc * N_d1 - K_disc * N_d2)
+    delta = sign * np.exp(-q * T) * N_d1
+    gamma = S_disc * n_d1 / (S * S * sigma_T_sqrt)
+    vega = S_disc * T_sqrt * n_d1
+    theta = -S_disc * n_d1 * sigma / (2 * T_sqrt) + sign * (q * S_disc * N_d1 - r_forward * K_disc * N_d2)
+    rho = sign * T * K_disc * N_d2
+    return ChainGreeks(price, delta, gamma, vega, theta, rho)
+
+
+def _curve_rates(r, T):
+    # (zero rate, forward rate) at each expiry: looked up on a term structure, or the flat rate twice
+    if hasattr(r, 'zero_rate'):
+        return r.zero_rate(T), r.forward_rate(T)
+    return r, r
+
+
+# status codes returned by Implied_vol_chain
+IV_CONVERGED = 0
+IV_MAX_ITERATION = 1
+IV_OUT_OF_BOUNDS = 2
+
+
+def _price_vega(S_disc, K_disc, T_sqrt, log_fwd, sign, sigma):
+    # price and vega only, from precomputed discounted spot/strike and log(F/K)
+    sigma_T_sqrt = sigma * T_sqrt
+    d1 = log_fwd / sigma_T_sqrt + 0.5 * sigma_T_sqrt
+    d2 = d1 - sigma_T_sqrt
+    price = sign * (S_disc * N(sign * d1) - K_disc * N(sign * d2))
+    return price, S_disc * T_sqrt * n(d1)
+
+
+def Implied_vol_chain(option_price, S, K, T, r, q=0.0, is_call=True, precision=1.0e-5,
+                      max_iteration=100, sigma_min=1.0e-6, sigma_max=10.0):
+    """
+    Invert a whole chain of option quotes to implied volatilities at once.
+
+    Each quote starts from the Corrado-Miller approximation and is refined
+    with Newton steps inside a [sigma_low, sigma_high] bracket that is
+    tightened after every evaluation. When vega is too small or the Newton
+    step leaves the bracket, the element takes a bisection step instead, so
+    deep OTM and short-dated quotes cannot blow up. Only elements that have
+    not converged yet are evaluated in each iteration.
+
+    Parameters:
+    option_price, S, K, T, r, q : float or array_like
+        Quoted price and the usual Black-Scholes inputs, broadcast together.
+        r may also be a yield_curve.TermStructure, as in BS_chain.
+    is_call : bool or array_like of bool
+        True for calls, False for puts.
+    precision : float, optional
+        Absolute price tolerance. Default is 1e-5, as in Implied_vol.
+    max_iteration : int, optional
+        Maximum number of Newton/bisection steps. Default is 100.
+    sigma_min, sigma_max : float, optional
+        Initial bracket for the volatility.
+
+    Returns:
+    tuple(ndarray, ndarray)
+        Implied volatilities and an int status array: IV_CONVERGED,
+        IV_MAX_ITERATION (best bracketed guess returned) or IV_OUT_OF_BOUNDS
+        (price violates the no-arbitrage bounds, T <= 0, S, K or T not
+        finite and positive, or the implied volatility lies outside
+        [sigma_min, sigma_max]; volatility is nan).
+    """
+    # expired quotes are masked below; a term structure is only asked for T >= 0
+    r = _curve_rates(r, np.maximum(np.asarray(T, dtype=float), 0.0))[0]
+    option_price, S, K, T, r, q = np.broadcast_arrays(
+        *[np.asarray(x, dtype=float) for x in (option_price, S, K, T, r, q)])
+    sign = np.broadcast_to(np.where(is_call, 1.0, -1.0), S.shape)
+    shape = S.shape
+    option_price, S, K, T, r, q, sign = [x.ravel() for x in (option_price, S, K, T, r, q, sign)]
+
+    S_disc = S * np.exp(-q * T)
+    K_disc = K * np.exp(-r * T)
+
+    sigma = np.full(S.shape, np.nan)
+    status = np.full(S.shape, IV_MAX_ITERATION, dtype=np.int8)
+
+    # no-arbitrage bounds: intrinsic value below, discounted spot/strike above. An expired
+    # quote (T <= 0) carries no volatility, so it is out of bounds too; masking it here keeps
+    # the divisions by sqrt(T) below away from zero
+    lower = np.maximum(sign * (S_disc - K_disc), 0.0)
+    upper = np.where(sign > 0, S_disc, K_disc)
+    valid = ((option_price > lower) & (option_price < upper) & (0 < T) & (T < np.inf)
+             & (0 < S) & (S < np.inf) & (0 < K) & (K < np.inf))
+    status[~valid] = IV_OUT_OF_BOUNDS
+
+    idx = np.flatnonzero(valid)
+    option_price, S_disc, K_disc, T, sign = (x[idx] for x in (option_price, S_disc, K_disc, T, sign))
+    T_sqrt = np.sqrt(T)
+    log_fwd = np.log(S_disc / K_disc)
+
+    # Corrado-Miller initial guess, written for the call price given by parity
+    call_price = np.where(sign > 0, option_price, option_price + S_disc - K_disc)
+    half_moneyness = 0.5 * (S_disc - K_disc)
+    root = np.sqrt(np.maximum((call_price - half_moneyness) ** 2 - 4 * half_moneyness ** 2 / np.pi, 0.0))
+    guess = np.sqrt(2 * np.pi) / (S_disc + K_disc) * (call_price - half_moneyness + root) / T_sqrt
+
+    # from here on, arrays indexed by `active` are positions among the valid quotes
+    active = np.arange(idx.size)
+    sig = np.clip(np.nan_to_num(guess, nan=0.2), sigma_min, sigma_max)
+    low = np.full(active.shape, sigma_min)
+    high = np.full(active.shape, sigma_max)
+    for i in range(max_iteration):
+        if active.size == 0:
+            break
+        price, vega = _price_vega(S_disc[active], K_disc[active], T_sqrt[active], log_fwd[active],
+                                  sign[active], sig)
+        diff = option_price[active] - price
+        converged = np.abs(diff) < precision
+        sigma[idx[active[converged]]] = sig[converged]
+        status[idx[active[converged]]] = IV_CONVERGED
+        # a bracket collapsed onto sigma_min or sigma_max with a residual left: the root lies
+        # outside the search range. Collapsed inside it, precision is finer than the price allows
+        collapsed = ~converged & (high - low < 1e-12)
+        at_edge = collapsed & ((high - sigma_min < 1e-12) | (sigma_max - low < 1e-12))
+        status[idx[active[at_edge]]] = IV_OUT_OF_BOUNDS
+        stuck = collapsed & ~at_edge
+        sigma[idx[active[stuck]]] = sig[stuck]
+        done = converged | collapsed
+
+        # price is increasing in sigma: shrink the bracket around the root
+        low = np.where(diff > 0, sig, low)
+        high = np.where(diff < 0, sig, high)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            newton = sig + diff / vega
+        bisect = ~((newton > low) & (newton < high))
+        sig = np.where(bisect, 0.5 * (low + high), newton)
+
+        keep = ~done
+        active, sig, low, high = active[keep], sig[keep], low[keep], high[keep]
+    # value wasn't found, return best bracketed guess so far
+    sigma[idx[active]] = sig
+    return sigma.reshape(shape), status.reshape(shape)
+
+
+if __name__ == '__main__':
+    from time import time
+    t0=time()
+    for i in range(1000):
+        bs = BS('C',50,65,1,0.03,0.15, 0.02)
+        bs.Delta()
+        bs.Gamma()
+        bs.Vega()
+        bs.Rho()
+        bs.Theta()
+        bs.BSM()
+        del bs
+        a = Implied_vol('C',50,65,1,0.03,0.02)
+        a.implied_vol(0.158842128257)
+    # print bs.BSM()
+    print(time()-t0)
+    a = Implied_vol('C',50,65,1,0.03,0.02)
+    print(a.implied_vol(0.158842128257))
+
+    # chain throughput: per-object loop vs one BS_chain call, in options/sec.
+    # Target for the vectorized path is >= 1e6 options/sec on a 50k chain.
+    n_loop, n_chain = 2000, 50000
+    t0 = time()
+    for i in range(n_loop):
+        bs = BS('C' if i % 2 else 'P', 50, 40 + i % 50, 1, 0.03, 0.15, 0.0)
+        bs.BSM(), bs.Delta(), bs.Gamma(), bs.Vega(), bs.Theta(), bs.Rho()
+    loop_rate = n_loop / (time() - t0)
+    strikes = 40 + np.arange(n_chain) % 50
+    is_call = np.arange(n_chain) % 2 == 1
+    BS_chain(50, strikes[:2], 1, 0.03, 0.15, 0.0, is_call[:2])  # first array call loads scipy
+    t0 = time()
+    BS_chain(50, strikes, 1, 0.03, 0.15, 0.0, is_call)
+    chain_rate = n_chain / (time() - t0)
+    print('per-object loop: %.0f options/sec' % loop_rate)
+    print('BS_chain:        %.0f options/sec (x%.0f)' % (chain_rate, chain_rate / loop_rate))
+
+    # implied vols for the whole chain from its own prices
+    prices = BS_chain(50, strikes, 1, 0.03, 0.15, 0.0, is_call).price
+    t0 = time()
+    vols, status = Implied_vol_chain(prices, 50, strikes, 1, 0.03, 0.0, is_call)
+    print('Implied_vol_chain: %d quotes in %.1f ms, %d converged'
+          % (n_chain, 1000 * (time() - t0), np.sum(status == IV_CONVERGED)))
+
+    # single precision: accuracy of every Greek against float64, relative to its largest magnitude
+    single = BS_chain(50, strikes, 1, 0.03, 0.15, 0.0, is_call, np.float32)
+    double = BS_chain(50, strikes, 1, 0.03, 0.15, 0.0, is_call)
+    print('float32 max relative error: ' + ', '.join(
+        '%s %.1e' % (name, np.max(np.abs(a - b)) / np.max(np.abs(b)))
+        for name, a, b in zip(ChainGreeks._fields, single, double)))
+# a = np.ones(10000)*10
+# b = np.ones(10000)
+# t1=time()
+# BSM('C',a,a,b,0.05,0.1, 0.0)
+# for i in xrange(10000):
+#     implied_vol(1.0,'C',10,10,1,0.05)
+# print time()-t1
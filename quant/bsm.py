@@ -0,0 +1,468 @@
+# -*- coding: utf-8 -*-
+# @Time    : 13/4/2017 2:31 PM
+# @Author  : Shen Tao
+# @Site    : 
+# @File    : BS.py
+# @Software: PyCharm
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+from .special_functions import norm_cdf as N, norm_pdf as n
+from .running_stats import RunningStats
+import numpy as np
+
+
+MCResult = namedtuple('MCResult', ['price', 'standard_error', 'wall_time', 'efficiency', 'n_paths'])
+
+# option_type names used by the Monte Carlo engines -> BSMAnalytical codes
+ANALYTICAL_CODES = {'call': 'C', 'put': 'P', 'digital_call': 'DC', 'digital_put': 'DP'}
+# payoff used as the 'analytical' control variate for each option_type: the
+# companion payoff on the same strike, whose price BSMAnalytical knows exactly
+COMPANION_PAYOFF = {'call': 'digital_call', 'put': 'digital_put',
+                    'digital_call': 'call', 'digital_put': 'put'}
+
+
+def option_payoff(ST, K, option_type):
+    """
+    Payoff at maturity of a European option for an array of terminal prices.
+
+    Parameters:
+    ST : ndarray
+        Simulated stock prices at maturity.
+    K : float
+        Strike price.
+    option_type : str
+        'call', 'put', 'digital_call' or 'digital_put'.
+
+    Returns:
+    ndarray
+        Float payoffs, one per simulated price, in the dtype of ST.
+    """
+    K = np.asarray(K, dtype=ST.dtype)
+    if option_type == 'call':
+        return np.maximum(ST - K, 0.0)
+    elif option_type == 'put':
+        return np.maximum(K - ST, 0.0)
+    elif option_type == 'digital_call':
+        return (ST > K).astype(ST.dtype)
+    elif option_type == 'digital_put':
+        return (ST < K).astype(ST.dtype)
+    else:
+        raise ValueError("option_type must be one of 'call', 'put', 'digital_call', or 'digital_put'")
+
+
+def monte_carlo_option_pricing(S0, K, T, r, sigma, M, option_type='call', notional=1.0,
+                               method='plain', control='analytical', full_output=False, rng=None,
+                               dtype=np.float64, draws=None):
+    """
+    Monte Carlo simulation to price a European option (without intermediate dates).
+    Also computes the standard error of the estimate.
+    
+    Parameters:
+    S0 : float
+        Initial stock price.
+    K : float
+        Strike price.
+    T : float
+        Time to expiration in years.
+    r : float
+        Risk-free interest rate.
+    sigma : float
+        Volatility of the stock (standard deviation of stock's returns).
+    M : int
+        Number of simulated price paths (Monte Carlo simulations).
+    option_type : str, optional
+        Type of option, either 'call', 'put', 'digital_call', or 'digital_put'. Default is 'call'.
+    notional : float, optional
+        Notional amount of the option. Default is 1.0.
+    method : str, optional
+        Variance reduction technique. Default is 'plain'.
+        - 'plain': independent draws.
+        - 'antithetic': M/2 draws z and their mirrors -z; the estimate averages each pair.
+        - 'control_variate': regression on a control with known expectation (see `control`).
+        - 'moment_matching': draws are shifted and rescaled to sample mean 0 and variance 1.
+          The reported standard error treats the matched draws as independent.
+    control : str, optional
+        Control used by method='control_variate'. Default is 'analytical'.
+        - 'analytical': the companion payoff on the same strike (digital for vanilla,
+          vanilla for digital), priced exactly by BSMAnalytical.
+        - 'stock': the discounted terminal stock price, whose expectation is S0.
+    full_output : bool, optional
+        If True, return an MCResult instead of (price, standard_error). Default is False.
+    rng : numpy.random.Generator, optional
+        Source of normal draws. Default is the global np.random state.
+    dtype : np.float64 or np.float32, optional
+        Precision of the normal draws and the simulated prices and payoffs.
+        float32 halves the memory traffic; the mean and variance accumulators
+        stay float64, so only about 1e-6 relative accuracy per path is lost.
+        Default is np.float64.
+    draws : array_like, optional
+        Standard normal draws to use instead of drawing from rng, e.g. a
+        crn_store.CRNStore memory map shared by every position on the same
+        underlying. The first M (M/2 rounded up for antithetic) are used; a
+        memory map of the requested dtype is read in place, without a copy.
+    
+    Returns:
+    tuple(float, float) or MCResult
+        Estimated price of the European option and its standard error. MCResult also
+        reports the wall time, the efficiency standard_error**2 * wall_time (variance
+        times cost, lower is better and independent of M) and the number of paths.
+    """
+    _check_mc_arguments(option_type, method, control, dtype)
+    if rng is None:
+        rng = np.random
+    t0 = perf_counter()
+    n_draws = (M + 1) // 2 if method == 'antithetic' else M  # each antithetic draw also gives its mirror -z
+    if draws is None:
+        z = standard_normal(rng, n_draws, dtype)  # Generate random normal variables
+    else:
+        if len(draws) < n_draws:
+            raise ValueError("draws holds %d normals, %d are needed" % (len(draws), n_draws))
+        z = np.asarray(draws[:n_draws], dtype=dtype)
+    if method == 'moment_matching':
+        if not z.flags.writeable:
+            z = z.copy()  # shared draws are read-only
+        z -= z.mean(dtype=np.float64)
+        z /= z.std(dtype=np.float64)
+    samples = _discounted_samples(z, S0, K, T, r, sigma, option_type, notional, method, control)
+    stats = RunningStats(samples.shape[1] if samples.ndim == 2 else 1)
+    stats.update(samples)
+    option_price, standard_error = _estimate(stats)
+
+    if not full_output:
+        return option_price, standard_error
+    wall_time = perf_counter() - t0
+    n_paths = 2 * n_draws if method == 'antithetic' else M
+    return MCResult(option_price, standard_error, wall_time, standard_error**2 * wall_time, n_paths)
+
+
+def monte_carlo_option_pricing_streaming(S0, K, T, r, sigma, option_type='call', notional=1.0,
+                                         method='plain', control='analytical', target_error=None,
+                                         max_time=None, max_paths=10**8, chunk_size=2**16, rng=None,
+                                         dtype=np.float64):
+    """
+    Constant-memory version of monte_carlo_option_pricing with early stopping.
+
+    Paths are simulated in blocks of `chunk_size` and folded into running
+    mean/covariance statistics, so memory stays at a few arrays of length
+    `chunk_size` whatever the number of paths. Simulation stops as soon as
+    the standard error reaches `target_error`, the wall time reaches
+    `max_time`, or `max_paths` paths have been simulated.
+
+    Parameters:
+    S0, K, T, r, sigma, option_type, notional, control, dtype :
+        As in monte_carlo_option_pricing.
+    method : str, optional
+        'plain', 'antithetic' or 'control_variate'. Moment matching needs all
+        draws at once and is not available here. Default is 'plain'.
+    target_error : float, optional
+        Stop once the standard error is at or below this value.
+    max_time : float, optional
+        Stop once this many seconds have elapsed.
+    max_paths : int, optional
+        Upper bound on the number of simulated paths. Default is 1e8.
+    chunk_size : int, optional
+        Number of normal draws per block. Default is 65536.
+    rng : numpy.random.Generator, optional
+        Source of normal draws. Default is the global np.random state.
+
+    Returns:
+    MCResult
+        Price, standard error, wall time, efficiency and the number of paths used.
+    """
+    _check_mc_arguments(option_type, method, control, dtype)
+    if method == 'moment_matching':
+        raise ValueError("moment matching needs all draws at once, use monte_carlo_option_pricing")
+    if rng is None:
+        rng = np.random
+    paths_per_draw = 2 if method == 'antithetic' else 1
+    stats = RunningStats(2 if method == 'control_variate' else 1)
+    t0 = perf_counter()
+    n_paths = 0
+    while n_paths < max_paths:
+        z = standard_normal(rng, min(chunk_size, -(-(max_paths - n_paths) // paths_per_draw)), dtype)
+        stats.update(_discounted_samples(z, S0, K, T, r, sigma, option_type, notional, method, control))
+        n_paths += paths_per_draw * z.size
+        # check the stopping rules once the variance estimate is meaningful
+        if stats.count > 1:
+            if target_error is not None and _estimate(stats)[1] <= target_error:
+                break
+            if max_time is not None and perf_counter() - t0 >= max_time:
+                break
+    option_price, standard_error = _estimate(stats)
+    wall_time = perf_counter() - t0
+    return MCResult(option_price, standard_error, wall_time, standard_error**2 * wall_time, n_paths)
+
+
+def monte_carlo_option_pricing_parallel(S0, K, T, r, sigma, M, option_type='call', notional=1.0,
+                                        method='plain', control='analytical', seed=None,
+                                        n_workers=None, block_size=2**20, dtype=np.float64):
+    """
+    Multi-process monte_carlo_option_pricing with reproducible random streams.
+
+    The M paths are cut into blocks of `block_size` draws. Block i draws from
+    its own Generator seeded with the i-th child of SeedSequence(seed).spawn,
+    blocks are simulated across a process pool and their partial statistics
+    are merged in block order. Neither the streams nor the merge order depend
+    on the number of workers, so for a given seed the result is bit-identical
+    for any `n_workers`.
+
+    Parameters:
+    S0, K, T, r, sigma, M, option_type, notional, control, dtype :
+        As in monte_carlo_option_pricing.
+    method : str, optional
+        'plain', 'antithetic' or 'control_variate'. Default is 'plain'.
+    seed : int or SeedSequence, optional
+        Root seed. Default None draws fresh entropy from the OS.
+    n_workers : int, optional
+        Number of worker processes. Default is os.cpu_count(); 1 runs in-process.
+    block_size : int, optional
+        Number of normal draws per block. Default is 2**20 (8 MB of float64, 4 MB of float32).
+
+    Returns:
+    MCResult
+        Price, standard error, wall time, efficiency and the number of paths used.
+    """
+    _check_mc_arguments(option_type, method, control, dtype)
+    if method == 'moment_matching':
+        raise ValueError("moment matching needs all draws at once, use monte_carlo_option_pricing")
+    t0 = perf_counter()
+    n_draws = (M + 1) // 2 if method == 'antithetic' else M
+    sizes = [min(block_size, n_draws - start) for start in range(0, n_draws, block_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(child, size, S0, K, T, r, sigma, option_type, notional, method, control, dtype)
+             for child, size in zip(seeds, sizes)]
+    if n_workers is None:
+        n_workers = os.cpu_count()
+    if n_workers == 1:
+        partials = map(_block_stats, tasks)
+        stats = _merge_in_order(partials, method)
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            # map returns results in task order, whichever worker finishes first
+            stats = _merge_in_order(pool.map(_block_stats, tasks), method)
+    option_price, standard_error = _estimate(stats)
+    wall_time = perf_counter() - t0
+    n_paths = 2 * n_draws if method == 'antithetic' else n_draws
+    return MCResult(option_price, standard_error, wall_time, standard_error**2 * wall_time, n_paths)
+
+
+def _block_stats(task):
+    # one block of the parallel engine; module level so that it can be pickled
+    seed, size, S0, K, T, r, sigma, option_type, notional, method, control, dtype = task
+    z = np.random.default_rng(seed).standard_normal(size, dtype=dtype)
+    samples = _discounted_samples(z, S0, K, T, r, sigma, option_type, notional, method, control)
+    stats = RunningStats(2 if method == 'control_variate' else 1)
+    stats.update(samples)
+    return stats
+
+
+def _merge_in_order(partials, method):
+    stats = RunningStats(2 if method == 'control_variate' else 1)
+    for partial in partials:
+        stats.merge(partial)
+    return stats
+
+
+def check_dtype(dtype):
+    """Raise ValueError unless dtype is one of the supported simulation precisions, float64 or float32."""
+    if np.dtype(dtype) not in (np.float64, np.float32):
+        raise ValueError("dtype must be np.float64 or np.float32")
+
+
+def _check_mc_arguments(option_type, method, control, dtype=np.float64):
+    check_dtype(dtype)
+    if option_type not in ANALYTICAL_CODES:
+        raise ValueError("option_type must be one of 'call', 'put', 'digital_call', or 'digital_put'")
+    if method not in ('plain', 'antithetic', 'control_variate', 'moment_matching'):
+        raise ValueError("method must be one of 'plain', 'antithetic', 'control_variate', or 'moment_matching'")
+    if method == 'control_variate' and control not in ('analytical', 'stock'):
+        raise ValueError("control must be either 'analytical' or 'stock'")
+
+
+def standard_normal(rng, size, dtype=np.float64):
+    """
+    Standard normal draws in the requested dtype, from a Generator or the legacy np.random API.
+
+    Only a Generator draws float32 natively; other sources draw float64 and are cast.
+    """
+    if isinstance(rng, np.random.Generator):
+        return rng.standard_normal(size, dtype=dtype)
+    return rng.standard_normal(size).astype(dtype, copy=False)
+
+
+def _discounted_samples(z, S0, K, T, r, sigma, option_type, notional, method, control):
+    """
+    Discounted payoff samples for one block of standard normal draws.
+
+    Returns a 1-d array, or for method='control_variate' an (n, 2) array whose
+    second column is the control minus its known expectation. Samples have
+    the dtype of z.
+    """
+    # python floats, so that float32 draws are not promoted by numpy float64 scalars
+    S0 = float(S0)
+    discount = float(np.exp(-r * T))
+    drift = float((r - 0.5 * sigma**2) * T)
+    vol = float(sigma * np.sqrt(T))
+    # Simulate the stock price at maturity using the GBM formula
+    ST = S0 * np.exp(drift + vol * z)
+    samples = option_payoff(ST, K, option_type)
+    if method == 'antithetic':
+        # average each path with its mirror: the pairs are the independent samples
+        samples += option_payoff(S0 * np.exp(drift - vol * z), K, option_type)
+        samples *= 0.5
+    # Discount the payoff back to present value and apply the notional amount
+    samples *= discount * notional
+    if method != 'control_variate':
+        return samples
+    if control == 'analytical':
+        companion = COMPANION_PAYOFF[option_type]
+        X = discount * option_payoff(ST, K, companion)
+        X -= BSMAnalytical(ANALYTICAL_CODES[companion], S0, K, T, r, sigma)
+    else:
+        X = discount * ST
+        X -= S0
+    return np.column_stack((samples, X))
+
+
+def _estimate(stats):
+    """Price and standard error from payoff statistics, with or without a control column."""
+    if stats.dim == 1:
+        return stats.mean[0], stats.standard_error()[0]
+    # optimal coefficient beta = Cov(Y, X) / Var(X), estimated from the same paths
+    C = stats.covariance()
+    beta = C[0, 1] / C[1, 1]
+    variance = C[0, 0] - beta * C[0, 1]
+    return stats.mean[0] - beta * stats.mean[1], np.sqrt(max(variance, 0.0) / stats.count)
+
+
+def BSMAnalytical(option_type, S, K, T, r, sigma, q=0.0):
+    """
+    计算欧式期权的BSM理论价格，包括普通欧式期权和数字期权。
+    
+    参数:
+    - option_type: 期权类型，'C' 表示普通看涨期权，'P' 表示普通看跌期权，
+                   'DC' 表示数字看涨期权，'DP' 表示数字看跌期权。
+    - S: 标的资产当前价格。
+    - K: 期权行权价。
+    - T: 期权到期时间（以年为单位）。
+    - r: 无风险利率。
+    - sigma: 标的资产的年化波动率。
+    - q: 标的资产的收益率（如股息率，默认为0）。
+    
+    返回值:
+    - 期权的理论价格。
+    """
+    # 计算d1和d2，这是BSM公式中的重要组成部分
+    d1 = (np.log(S/ K) + ((r - q) + sigma ** 2 / 2) * T) / (sigma * np.sqrt(T))
+    d2 = d1 - sigma * np.sqrt(T)
+    
+    # 根据期权类型计算理论价格
+    if option_type == 'C':
+        # 普通看涨期权的理论价格计算公式
+        return S * np.exp(-q * T) * N(d1) - K * np.exp(-r * T) * N(d2)
+    elif option_type == 'P':
+        # 普通看跌期权的理论价格计算公式
+        return K * np.exp(-r * T) * N(-d2) - S * np.exp(-q * T) * N(-d1)
+    elif option_type == 'DC':
+        # 数字看涨期权的理论价格计算公式
+        return np.exp(-r * T) * N(d2)
+    elif option_type == 'DP':
+        # 数字看跌期权的理论价格计算公式
+        return np.exp(-r * T) * N(-d2)
+    else:
+        # 如果期权类型不正确，则输出错误信息并返回0
+        print('option type is not included')
+        return 0
+def BS_vega(option_type, S, K, T, r, sigma, q=0.0):
+    d1 = (np.log(S / K) + (r - q + sigma ** 2 / 2.0) * T) / (sigma * np.sqrt(T))
+    if option_type in ['C', 'P']:
+        return S * np.sqrt(T) * n(d1)
+    elif option_type in ['DC', 'DP']:
+        return np.exp(-r * T) * np.sqrt(T) * n(d1)
+    else:
+        raise ValueError("option_type must be one of 'C', 'P', 'DC', or 'DP'")
+def implied_vol(option_price, option_type, S, K, T, r,q=0,precision = 1.0e-5,max_iteration = 100):
+    sigma = 0.1
+    for i in range(0, max_iteration):
+        price = BSMAnalytical(option_type, S, K, T, r, sigma, q)
+        diff = option_price - price  # our root
+        if (abs(diff) < precision):
+            return sigma
+        vega = BS_vega(option_type, S, K, T, r, sigma, q)
+        sigma = sigma + diff/vega # f(x) / f'(x)
+    # value wasn't found, return best guess so far
+    return sigma
+# from time import time
+# t0=time()
+# for i in range(10000):
+#     BSM('C',10,10,1,0.05,0.1, q=0.0)
+#     implied_vol(1.0,'C',10,10,1,0.05)
+# print(time()-t0)
+# a = np.ones(10000)*10
+# b = np.ones(10000)
+# t0=time()
+# BSM('C',a,a,b,0.05,0.1, q=0.0)
+# for i in range(10000):
+#     implied_vol(1.0,'C',10,10,1,0.05)
+# print(time()-t0)
+
+
+if __name__ == '__main__':
+    # Example usage:
+    S0 = 1.05    # Initial stock price
+    K =  1.35    # Strike price
+    T = 5       # Time to expiration in years
+    r = 0.02    # Risk-free interest rate
+    sigma = 0.08 # Volatility of the stock
+    M = 1000000   # Number of simulated price paths
+
+    call_price, std_error = monte_carlo_option_pricing(S0, K, T, r, sigma, M)
+    print(f"Estimated price of the European call option: {call_price:.4f}")
+    print(f"Standard error of the estimated call price: {std_error:.6f}")
+
+    analytical = BSMAnalytical('C',S0,K,T,r,sigma, q=0.0)
+    print(analytical)
+
+    # variance reduction: efficiency gain is plain efficiency / method efficiency,
+    # i.e. how many times fewer paths (at equal cost per path) reach the same error
+    for option_type in ('call', 'put', 'digital_call', 'digital_put'):
+        exact = BSMAnalytical(ANALYTICAL_CODES[option_type], S0, K, T, r, sigma)
+        plain = monte_carlo_option_pricing(S0, K, T, r, sigma, M, option_type, full_output=True)
+        print(f"{option_type}: analytical {exact:.6f}")
+        for method, control in (('plain', None), ('antithetic', None), ('moment_matching', None),
+                                ('control_variate', 'analytical'), ('control_variate', 'stock')):
+            res = monte_carlo_option_pricing(S0, K, T, r, sigma, M, option_type, method=method,
+                                             control=control, full_output=True)
+            label = method if control is None else f"{method}({control})"
+            print(f"  {label:30s} {res.price:.6f} +- {res.standard_error:.6f}"
+                  f"  {res.wall_time * 1000:6.1f} ms  gain x{plain.efficiency / res.efficiency:.1f}")
+
+    # streaming engine: stop at a target standard error instead of a fixed M
+    res = monte_carlo_option_pricing_streaming(S0, K, T, r, sigma, 'call', method='control_variate',
+                                               target_error=1e-5)
+    print(f"streaming call to SE 1e-5: {res.price:.6f} +- {res.standard_error:.6f}"
+          f" with {res.n_paths} paths in {res.wall_time * 1000:.1f} ms")
+
+    # parallel engine: same seed gives the same bits for any number of workers
+    for n_workers in (1, 2, os.cpu_count()):
+        res = monte_carlo_option_pricing_parallel(S0, K, T, r, sigma, 10 * M, 'call', seed=2024,
+                                                  n_workers=n_workers)
+        print(f"parallel call, {n_workers:2d} workers: {float(res.price)!r} +- {res.standard_error:.6f}"
+              f" in {res.wall_time * 1000:.1f} ms")
+
+    # float32: accuracy against float64 on the same draws, then the cost of each full engine run
+    z = np.random.default_rng(7).standard_normal(M)
+    for option_type in ('call', 'digital_call'):
+        reference = _discounted_samples(z, S0, K, T, r, sigma, option_type, 1.0, 'plain', 'analytical')
+        single = _discounted_samples(z.astype(np.float32), S0, K, T, r, sigma, option_type, 1.0, 'plain',
+                                     'analytical')
+        mean_64, mean_32 = reference.mean(), single.mean(dtype=np.float64)
+        print(f"float32 {option_type}: price {mean_32:.8f} vs float64 {mean_64:.8f},"
+              f" relative difference {abs(mean_32 / mean_64 - 1):.1e}")
+    for dtype in (np.float64, np.float32):
+        res = monte_carlo_option_pricing(S0, K, T, r, sigma, 10 * M, 'call', full_output=True,
+                                         rng=np.random.default_rng(7), dtype=dtype)
+        print(f"{np.dtype(dtype).name} call, {10 * M} paths: {res.price:.6f} +- {res.standard_error:.6f}"
+              f" in {res.wall_time * 1000:.0f} ms")
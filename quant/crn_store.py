@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+Common random numbers for portfolio revaluation, shared through memory-mapped files.
+
+Pricing every position with fresh draws regenerates the same-sized normal
+arrays once per position, and leaves the Monte Carlo errors of positions on
+the same underlying independent, so a book's P&L is noisier than any of its
+positions. CRNStore generates the draws of each (seed, underlying) once into
+a .npy file and hands out read-only memory maps of it: every position on
+that underlying reuses the same paths, and worker processes attach to the
+file by path, sharing the operating system's page cache instead of copying
+or regenerating the array.
+
+The draws of an underlying come from SeedSequence(seed) with a spawn key
+derived from the underlying's name, so they are reproducible across runs
+and machines and independent between underlyings. Files are generated in
+blocks (memory stays O(block_size)) into a temporary name and then renamed,
+so concurrent processes never see a partially written store.
+
+monte_carlo_option_pricing and the GUI's monte_carlo_simulation take the
+memory map through their `draws` argument.
+"""
+import os
+import tempfile
+import zlib
+from time import perf_counter
+import numpy as np
+
+DEFAULT_DIRECTORY = os.path.join(tempfile.gettempdir(), 'quant_crn')
+
+
+def attach(path):
+    """Open a store file read-only and memory-mapped; this is what worker processes call."""
+    return np.load(path, mmap_mode='r')
+
+
+class CRNStore(object):
+    """
+    Normal draws generated once per (seed, underlying) and memory-mapped on every later use.
+
+    :param directory: Where the .npy files live. Default is quant_crn in the system temp directory.
+    :param dtype: np.float64 or np.float32. Default is np.float64.
+    :param block_size: Number of draws generated at a time. Default is 2**20.
+
+    generation_time and reuse_time accumulate the seconds spent creating files
+    and attaching to existing ones; n_generated and n_reused count the calls.
+    """
+    def __init__(self, directory=None, dtype=np.float64, block_size=2**20):
+        self.directory = DEFAULT_DIRECTORY if directory is None else directory
+        self.dtype = np.dtype(dtype)
+        if self.dtype not in (np.float64, np.float32):
+            raise ValueError("dtype must be np.float64 or np.float32")
+        self.block_size = block_size
+        self.generation_time = 0.0
+        self.reuse_time = 0.0
+        self.n_generated = 0
+        self.n_reused = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path(self, seed, n_draws, underlying=None):
+        """File holding the draws of (seed, underlying); it may not exist yet."""
+        name = 'crn_%d_%08x_%d_%s.npy' % (seed, _underlying_key(underlying), n_draws, self.dtype.name)
+        return os.path.join(self.directory, name)
+
+    def draws(self, seed, n_draws, underlying=None):
+        """
+        Read-only memory map of n_draws standard normal draws for (seed, underlying).
+
+        The file is generated on the first request and reused afterwards, by this
+        store and by any process that attaches to the same path.
+        """
+        path = self.path(seed, n_draws, underlying)
+        t0 = perf_counter()
+        if os.path.exists(path):
+            z = attach(path)
+            self.reuse_time += perf_counter() - t0
+            self.n_reused += 1
+            return z
+        self._generate(path, seed, n_draws, underlying)
+        z = attach(path)
+        self.generation_time += perf_counter() - t0
+        self.n_generated += 1
+        return z
+
+    def _generate(self, path, seed, n_draws, underlying):
+        rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(_underlying_key(underlying),)))
+        # write under a name unique to this process, then publish atomically
+        tmp = '%s.%d.tmp' % (path, os.getpid())
+        out = np.lib.format.open_memmap(tmp, mode='w+', dtype=self.dtype, shape=(n_draws,))
+        for start in range(0, n_draws, self.block_size):
+            block = out[start:start + self.block_size]
+            rng.standard_normal(block.size, dtype=self.dtype, out=block)
+        out.flush()
+        del out
+        os.replace(tmp, path)
+
+    def report(self):
+        """Dict of generation and reuse counts and timings, with the average time per call."""
+        return {
+            'generated': self.n_generated,
+            'generation_time': self.generation_time,
+            'reused': self.n_reused,
+            'reuse_time': self.reuse_time,
+            'average_reuse_time': self.reuse_time / self.n_reused if self.n_reused else 0.0,
+        }
+
+    def clear(self):
+        """Delete every store file in the directory."""
+        for name in os.listdir(self.directory):
+            if name.startswith('crn_') and name.endswith('.npy'):
+                os.remove(os.path.join(self.directory, name))
+
+
+def _underlying_key(underlying):
+    # stable across processes and runs, unlike hash()
+    return 0 if underlying is None else zlib.crc32(str(underlying).encode('utf-8'))
+
+
+def _price_positions(task):
+    # worker: attach to the underlying's draws by path and price its positions on them
+    path, positions, M = task
+    from .bsm import monte_carlo_option_pricing
+    z = attach(path)
+    return [monte_carlo_option_pricing(S0, K, T, r, sigma, M, option_type, draws=z)[0]
+            for S0, K, T, r, sigma, option_type in positions]
+
+
+if __name__ == '__main__':
+    from concurrent.futures import ProcessPoolExecutor
+    from .bsm import monte_carlo_option_pricing, BSMAnalytical
+    M, n_positions, seed = 200000, 400, 2024
+    spots = {'AAA': 100.0, 'BBB': 50.0, 'CCC': 250.0, 'DDD': 20.0}
+    rng = np.random.default_rng(0)
+    per_underlying = n_positions // len(spots)
+    book = {name: [(S0, S0 * k, t, 0.03, 0.25, 'call') for k, t in
+                   zip(rng.uniform(0.8, 1.2, per_underlying), rng.choice([0.25, 0.5, 1.0], per_underlying))]
+            for name, S0 in spots.items()}
+
+    t0 = perf_counter()
+    for positions in book.values():
+        for S0, K, T, r, sigma, option_type in positions:
+            monte_carlo_option_pricing(S0, K, T, r, sigma, M, option_type, rng=rng)
+    print(f"fresh draws per position: {perf_counter() - t0:.2f} s for {n_positions} positions")
+
+    store = CRNStore()
+    store.clear()
+    for attempt in ('first run', 'second run'):
+        t0 = perf_counter()
+        tasks = []
+        for name, positions in book.items():
+            store.draws(seed, M, name)  # generated on the first run, attached to on the second
+            tasks.append((store.path(seed, M, name), positions, M))
+        with ProcessPoolExecutor() as pool:
+            prices = list(pool.map(_price_positions, tasks))
+        print(f"CRN store, {attempt}: {perf_counter() - t0:.2f} s, {store.report()}")
+
+    # a call spread on common draws is far more accurate than on independent ones
+    S0, K1, K2, T = 100.0, 100.0, 105.0, 1.0
+    exact = BSMAnalytical('C', S0, K1, T, 0.03, 0.25) - BSMAnalytical('C', S0, K2, T, 0.03, 0.25)
+    z = store.draws(seed, M, 'AAA')
+    common = (monte_carlo_option_pricing(S0, K1, T, 0.03, 0.25, M, draws=z)[0]
+              - monte_carlo_option_pricing(S0, K2, T, 0.03, 0.25, M, draws=z)[0])
+    independent = (monte_carlo_option_pricing(S0, K1, T, 0.03, 0.25, M, rng=rng)[0]
+                   - monte_carlo_option_pricing(S0, K2, T, 0.03, 0.25, M, rng=rng)[0])
+    print(f"100/105 call spread: exact {exact:.4f}, common draws {common:.4f}, independent draws {independent:.4f}")
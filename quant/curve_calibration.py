@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Batch calibration of Nelson-Siegel and Svensson curves to observed spot yields.
+
+Given the decay parameters (lambda0 for NS, tau1/tau2 for SV) the curves are
+linear in the betas, so each fit is profiled over the decay parameters only:
+- a global grid over the decay parameters, where the loading matrices are
+  shared by every date and one QR per grid point gives the least-squares
+  residual of all dates at once;
+- a few rounds of a shrinking local grid around each date's best point, with
+  batched per-date least squares.
+Passing the decay parameters of a previous fit (e.g. the previous day or the
+previous intraday snapshot) as `initial_decay` skips the global grid and only
+refines locally from there.
+"""
+from collections import namedtuple
+from time import perf_counter
+import numpy as np
+from .Nelson_Siegel import NS_loadings
+from .NSS import SV_loadings
+
+CurveFit = namedtuple('CurveFit', ['betas', 'decay', 'rmse', 'fit_time'])
+
+DEFAULT_DECAY_GRID = np.geomspace(0.1, 20.0, 48)
+
+
+def calibrate_NS(m, yields, lambda_grid=DEFAULT_DECAY_GRID, initial_decay=None, n_refine=6):
+    """
+    Fit Nelson-Siegel curves to a panel of spot yield curves.
+
+    Parameters:
+    m : array_like
+        Maturities of the observed yields, shape (n_maturities,).
+    yields : array_like
+        Observed spot yields, shape (n_dates, n_maturities) or (n_maturities,).
+    lambda_grid : array_like, optional
+        Global grid of lambda0 values, used when initial_decay is None.
+    initial_decay : float or array_like, optional
+        lambda0 of a previous fit (one per date, or one for all) to warm-start from.
+    n_refine : int, optional
+        Number of local refinement rounds. Default is 6.
+
+    Returns:
+    CurveFit
+        betas (n_dates, 3), decay lambda0 (n_dates,), rmse (n_dates,) and the
+        average fit time per curve in seconds.
+    """
+    def loadings(decay, maturities):
+        return NS_loadings(decay[..., 0], maturities)[0]
+    grid = np.asarray(lambda_grid, dtype=float)[:, None]
+    fit = _calibrate(m, yields, loadings, grid, initial_decay, n_refine, 1)
+    return fit._replace(decay=fit.decay[:, 0])
+
+
+def calibrate_SV(m, yields, tau_grid=DEFAULT_DECAY_GRID, initial_decay=None, n_refine=6):
+    """
+    Fit Svensson curves to a panel of spot yield curves.
+
+    Parameters:
+    m : array_like
+        Maturities of the observed yields, shape (n_maturities,).
+    yields : array_like
+        Observed spot yields, shape (n_dates, n_maturities) or (n_maturities,).
+    tau_grid : array_like, optional
+        Grid of decay values; the global grid is every pair tau1 < tau2 from it.
+    initial_decay : array_like, optional
+        (tau1, tau2) of a previous fit, shape (2,) or (n_dates, 2), to warm-start from.
+    n_refine : int, optional
+        Number of local refinement rounds. Default is 6.
+
+    Returns:
+    CurveFit
+        betas (n_dates, 4), decay (n_dates, 2) as (tau1, tau2), rmse (n_dates,) and
+        the average fit time per curve in seconds.
+    """
+    def loadings(decay, maturities):
+        return SV_loadings(decay[..., 0], decay[..., 1], maturities)[0]
+    taus = np.asarray(tau_grid, dtype=float)
+    i, j = np.triu_indices(taus.size, k=1)
+    grid = np.column_stack([taus[i], taus[j]])
+    return _calibrate(m, yields, loadings, grid, initial_decay, n_refine, 2)
+
+
+def _calibrate(m, yields, loadings, grid, initial_decay, n_refine, n_decay):
+    t0 = perf_counter()
+    m = np.asarray(m, dtype=float)
+    Y = np.atleast_2d(np.asarray(yields, dtype=float))
+    n_dates = Y.shape[0]
+    sum_sq = np.einsum('dm,dm->d', Y, Y)
+
+    if initial_decay is None:
+        # global grid: the same loading matrix serves every date, SSE = |y|^2 - |Q^T y|^2
+        Q = np.linalg.qr(loadings(grid[:, None, :], m))[0]
+        projected = np.einsum('gmp,dm->gdp', Q, Y)
+        sse = sum_sq - np.einsum('gdp,gdp->gd', projected, projected)
+        decay = grid[np.argmin(sse, axis=0)]
+        # local steps start at the grid spacing of each decay parameter
+        width = np.array([_log_spacing(grid[:, j]) for j in range(n_decay)])
+    else:
+        decay = np.broadcast_to(np.asarray(initial_decay, dtype=float).reshape(-1, n_decay),
+                                (n_dates, n_decay)).copy()
+        width = 0.25
+    decay = np.log(decay)
+
+    # local refinement in log space, one candidate offset at a time for all dates
+    steps = np.linspace(-1.0, 1.0, 5)
+    offsets = np.stack(np.meshgrid(*[steps] * n_decay, indexing='ij'), axis=-1).reshape(-1, n_decay)
+    best_sse = _batched_sse(loadings(np.exp(decay)[:, None, :], m), Y, sum_sq)
+    for i in range(n_refine):
+        center = decay
+        for offset in offsets:
+            if not offset.any():
+                continue
+            candidate = center + width * offset
+            sse = _batched_sse(loadings(np.exp(candidate)[:, None, :], m), Y, sum_sq)
+            if n_decay == 2:
+                sse[candidate[:, 0] >= candidate[:, 1]] = np.inf  # keep tau1 < tau2
+            better = sse < best_sse
+            decay = np.where(better[:, None], candidate, decay)
+            best_sse = np.where(better, sse, best_sse)
+        width *= 0.4
+    decay = np.exp(decay)
+
+    # QR rather than the normal equations, which would square the condition number of the loadings
+    L = loadings(decay[:, None, :], m)
+    Q, R = np.linalg.qr(L)
+    betas = np.linalg.solve(R, np.einsum('dmp,dm->dp', Q, Y)[..., None])[..., 0]
+    residual = Y - np.einsum('dmp,dp->dm', L, betas)
+    rmse = np.sqrt(np.mean(residual**2, axis=1))
+    return CurveFit(betas, decay, rmse, (perf_counter() - t0) / n_dates)
+
+
+def _log_spacing(values):
+    # widest gap between neighbouring grid values in log space
+    gaps = np.diff(np.unique(np.log(values)))
+    return gaps.max() if gaps.size else 0.5
+
+
+def _batched_sse(L, Y, sum_sq):
+    # least-squares residual of each date's yields on its own loading matrix
+    Q = np.linalg.qr(L)[0]
+    projected = np.einsum('dmp,dm->dp', Q, Y)
+    return np.maximum(sum_sq - np.einsum('dp,dp->d', projected, projected), 0.0)
+
+
+if __name__ == '__main__':
+    from .Nelson_Siegel import NS
+    from .NSS import SV
+    rng = np.random.default_rng(0)
+    m = np.array([0.25, 0.5, 1, 2, 3, 5, 7, 10, 15, 20, 30])
+    n_dates = 2000
+
+    # a slowly moving panel of NS curves with 1bp noise
+    betas = np.array([0.04, -0.02, 0.01]) + np.cumsum(rng.normal(0, 5e-4, (n_dates, 3)), axis=0)
+    lambdas = 2.0 * np.exp(np.cumsum(rng.normal(0, 0.01, n_dates)))
+    Y = NS(betas[:, :1], betas[:, 1:2], betas[:, 2:], lambdas[:, None], m)[0] + rng.normal(0, 1e-4, (n_dates, m.size))
+    fit = calibrate_NS(m, Y)
+    print(f"NS, {n_dates} curves: {fit.fit_time * 1e6:.1f} us/curve, median rmse {np.median(fit.rmse) * 1e4:.2f} bp,"
+          f" median |lambda error| {np.median(np.abs(fit.decay - lambdas)):.3f}")
+    warm = calibrate_NS(m, Y[1:], initial_decay=fit.decay[:-1])
+    print(f"NS warm-started from the previous date: {warm.fit_time * 1e6:.1f} us/curve,"
+          f" median rmse {np.median(warm.rmse) * 1e4:.2f} bp")
+
+    betas = np.array([0.04, -0.02, 0.01, 0.015]) + np.cumsum(rng.normal(0, 5e-4, (n_dates, 4)), axis=0)
+    Y = SV(betas[:, :1], betas[:, 1:2], betas[:, 2:3], betas[:, 3:], 1.5, 9.0, m)[0] + rng.normal(0, 1e-4, (n_dates, m.size))
+    fit = calibrate_SV(m, Y)
+    print(f"SV, {n_dates} curves: {fit.fit_time * 1e6:.1f} us/curve, median rmse {np.median(fit.rmse) * 1e4:.2f} bp")
+    warm = calibrate_SV(m, Y[1:], initial_decay=fit.decay[:-1])
+    print(f"SV warm-started from the previous date: {warm.fit_time * 1e6:.1f} us/curve,"
+          f" median rmse {np.median(warm.rmse) * 1e4:.2f} bp")
@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-
+"""
+Loop kernels with an optional Numba backend.
+
+Some workloads are naturally written as a scalar loop per quote or per path:
+a Newton iteration whose number of steps differs from quote to quote, or a
+time-stepping loop that only needs the current state of each path. NumPy
+runs them as whole-array passes over an ever smaller active set (or one
+pass per time step, with temporaries); Numba compiles the scalar loop
+itself, with the outer loop over independent quotes/paths spread across
+cores by prange.
+
+Kernels:
+- implied_vol: the safeguarded Newton iteration of Implied_vol_chain run
+  quote by quote: same no-arbitrage checks, Corrado-Miller guess, shrinking
+  [low, high] bracket and status codes. The numpy backend is
+  Implied_vol_chain itself.
+- gbm_path_average: arithmetic average of the GBM path over its n_steps
+  monitoring dates, given the normal draws of each path.
+- cir_euler_paths: reflected Euler scheme of the CIR short rate, as in
+  cir.simulate_cir_euler, given the normal draws of each path.
+
+The backend is chosen like the normal CDF backend in special_functions:
+'numba' when numba is installed, 'numpy' otherwise, and set_backend switches
+between the two. Both backends run the same iterations, but the loops
+evaluate the normal CDF with math.erfc and NumPy with scipy's ndtr, so they
+agree within a tolerance rather than bit for bit: to about 1e-12 relative
+on the path kernels, and within the requested precision on implied vols
+(tests/test_jit_parity.py checks the plain-Python loops against NumPy).
+Numba compiles each kernel on its first call, which takes a second or so.
+"""
+import math
+import numpy as np
+from .special_functions import norm_cdf as N, norm_pdf as n
+from .black_scholes import Implied_vol_chain, IV_CONVERGED, IV_MAX_ITERATION, IV_OUT_OF_BOUNDS
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+    prange = range
+
+NUMBA_AVAILABLE = njit is not None
+# the default search range of Implied_vol_chain
+SIGMA_LOW = 1e-6
+SIGMA_HIGH = 10.0
+SQRT_2 = math.sqrt(2.0)
+SQRT_2PI = math.sqrt(2.0 * math.pi)
+INV_SQRT_2PI = 1.0 / SQRT_2PI
+
+
+# scalar loops: the numba backend compiles these, they are also valid plain Python
+
+def _implied_vol_loop(price, S_disc, K_disc, T, sign, precision, max_iteration, out, status):
+    for i in prange(price.size):
+        out[i] = math.nan
+        status[i] = IV_OUT_OF_BOUNDS
+        # no-arbitrage bounds and T > 0 as in Implied_vol_chain; a nan fails every comparison
+        lower = max(sign[i] * (S_disc[i] - K_disc[i]), 0.0)
+        upper = S_disc[i] if sign[i] > 0 else K_disc[i]
+        if not (lower < price[i] < upper and 0 < T[i] < math.inf and 0 < S_disc[i] < math.inf
+                and 0 < K_disc[i] < math.inf):
+            continue
+        T_sqrt = math.sqrt(T[i])
+        log_fwd = math.log(S_disc[i] / K_disc[i])
+        # Corrado-Miller initial guess, written for the call price given by parity
+        call_price = price[i] if sign[i] > 0 else price[i] + S_disc[i] - K_disc[i]
+        half_moneyness = 0.5 * (S_disc[i] - K_disc[i])
+        root = math.sqrt(max((call_price - half_moneyness) ** 2 - 4 * half_moneyness ** 2 / math.pi, 0.0))
+        sigma = SQRT_2PI / (S_disc[i] + K_disc[i]) * (call_price - half_moneyness + root) / T_sqrt
+        sigma = min(max(sigma, SIGMA_LOW), SIGMA_HIGH) if sigma == sigma else 0.2
+        low, high = SIGMA_LOW, SIGMA_HIGH
+        status[i] = IV_MAX_ITERATION
+        for j in range(max_iteration):
+            sigma_T_sqrt = sigma * T_sqrt
+            d1 = log_fwd / sigma_T_sqrt + 0.5 * sigma_T_sqrt
+            d2 = d1 - sigma_T_sqrt
+            model = sign[i] * (S_disc[i] * 0.5 * math.erfc(-sign[i] * d1 / SQRT_2)
+                               - K_disc[i] * 0.5 * math.erfc(-sign[i] * d2 / SQRT_2))
+            diff = price[i] - model
+            if abs(diff) < precision:
+                status[i] = IV_CONVERGED
+                break
+            if high - low < 1e-12:
+                # collapsed onto an edge: the root lies outside [SIGMA_LOW, SIGMA_HIGH]
+                if high - SIGMA_LOW < 1e-12 or SIGMA_HIGH - low < 1e-12:
+                    status[i] = IV_OUT_OF_BOUNDS
+                    sigma = math.nan
+                break
+            # price is increasing in sigma: shrink the bracket around the root
+            if diff > 0:
+                low = sigma
+            elif diff < 0:
+                high = sigma
+            vega = S_disc[i] * T_sqrt * INV_SQRT_2PI * math.exp(-0.5 * d1 * d1)
+            newton = sigma + diff / vega if vega > 0 else low
+            sigma = newton if low < newton < high else 0.5 * (low + high)
+        out[i] = sigma
+
+
+def _gbm_average_loop(S0, drift, vol, z, out):
+    n_paths, n_steps = z.shape
+    for i in prange(n_paths):
+        S = S0
+        total = 0.0
+        for j in range(n_steps):
+            S *= math.exp(drift + vol * z[i, j])
+            total += S
+        out[i] = total / n_steps
+
+
+def _cir_euler_loop(r0, a, b, sigma, dt, z, out):
+    n_paths, n_steps = z.shape
+    shrink = 1 - a * dt
+    vol = sigma * math.sqrt(dt)
+    for i in prange(n_paths):
+        r = r0
+        for j in range(n_steps):
+            r = abs(r * shrink + (math.sqrt(r) * vol * z[i, j] + a * b * dt))
+        out[i] = r
+
+
+# numpy: the same arithmetic, vectorized over paths; implied vols use Implied_vol_chain
+
+def _gbm_average_numpy(S0, drift, vol, z, out):
+    n_paths, n_steps = z.shape
+    S = np.full(n_paths, float(S0))
+    total = np.zeros(n_paths)
+    growth = np.empty(n_paths)
+    for j in range(n_steps):
+        np.multiply(z[:, j], vol, out=growth)
+        growth += drift
+        np.exp(growth, out=growth)
+        S *= growth
+        total += S
+    np.divide(total, n_steps, out=out)
+
+
+def _cir_euler_numpy(r0, a, b, sigma, dt, z, out):
+    n_paths, n_steps = z.shape
+    shrink = 1 - a * dt
+    vol = sigma * math.sqrt(dt)
+    r = np.full(n_paths, float(r0))
+    diffusion = np.empty(n_paths)
+    for j in range(n_steps):
+        np.sqrt(r, out=diffusion)
+        diffusion *= vol
+        diffusion *= z[:, j]
+        diffusion += a * b * dt
+        r *= shrink
+        r += diffusion
+        np.abs(r, out=r)
+    out[:] = r
+
+
+def _loop_implied_vol(loop):
+    # Implied_vol_chain's interface on top of an implied vol loop kernel
+    def implied_vol(option_price, S, K, T, r, q, is_call, precision, max_iteration):
+        price, S, K, T, r, q, is_call = np.broadcast_arrays(
+            *[np.asarray(x, dtype=float) for x in (option_price, S, K, T, r, q)], np.asarray(is_call))
+        shape = price.shape
+        sign = np.where(is_call, 1.0, -1.0).ravel()
+        out = np.empty(sign.size)
+        status = np.empty(sign.size, dtype=np.int8)
+        with np.errstate(invalid='ignore', over='ignore'):
+            S_disc = (S * np.exp(-q * T)).ravel()
+            K_disc = (K * np.exp(-r * T)).ravel()
+        loop(np.ascontiguousarray(price).ravel(), S_disc, K_disc, np.ascontiguousarray(T).ravel(),
+             sign, precision, max_iteration, out, status)
+        return out.reshape(shape), status.reshape(shape)
+    return implied_vol
+
+
+_BACKENDS = {
+    'numpy': (Implied_vol_chain, _gbm_average_numpy, _cir_euler_numpy),
+}
+if NUMBA_AVAILABLE:
+    # compiled lazily on the first call of each kernel; outer loops are prange, iterations independent
+    _implied_vol_jit, _gbm_average_jit, _cir_euler_jit = (
+        njit(parallel=True, cache=True)(loop) for loop in (_implied_vol_loop, _gbm_average_loop, _cir_euler_loop))
+    _BACKENDS['numba'] = (_loop_implied_vol(_implied_vol_jit), _gbm_average_jit, _cir_euler_jit)
+_backend = None
+
+
+def set_backend(name):
+    """
+    Select the implementation of every kernel.
+
+    :param name: 'numba' (compiled loops, needs numba) or 'numpy'.
+    """
+    global _backend, _implied_vol_kernel, _gbm_average_kernel, _cir_euler_kernel
+    if name not in _BACKENDS:
+        if name == 'numba':
+            raise ValueError("the numba backend needs numba, which is not installed")
+        raise ValueError("backend must be one of %s" % sorted(_BACKENDS))
+    _implied_vol_kernel, _gbm_average_kernel, _cir_euler_kernel = _BACKENDS[name]
+    _backend = name
+
+
+def get_backend():
+    """Return the name of the active backend."""
+    return _backend
+
+
+def implied_vol(option_price, S, K, T, r, q=0.0, is_call=True, precision=1.0e-5, max_iteration=100):
+    """
+    Implied volatility of every quote, one safeguarded Newton iteration each.
+
+    On the numpy backend this is Implied_vol_chain; r must be a rate (flat or
+    per quote), not a TermStructure, on the numba backend.
+
+    Parameters:
+    option_price, S, K, T, r, q : float or array_like
+        Quotes and their Black-Scholes inputs, broadcast against each other.
+    is_call : bool or array_like of bool
+        True for calls, False for puts.
+    precision : float, optional
+        Stop once the model price is within this of the quote. Default is 1e-5.
+    max_iteration : int, optional
+        Maximum number of Newton/bisection steps per quote. Default is 100.
+
+    Returns:
+    tuple
+        (implied volatilities, status), both shaped like the broadcast inputs,
+        as returned by Implied_vol_chain: IV_CONVERGED, IV_MAX_ITERATION (best
+        bracketed guess), or IV_OUT_OF_BOUNDS with a nan vol for quotes outside
+        the no-arbitrage bounds, with T <= 0, or implied by a vol outside
+        [1e-6, 10].
+    """
+    return _implied_vol_kernel(option_price, S, K, T, r, q, is_call, precision, max_iteration)
+
+
+def gbm_path_average(S0, r, sigma, T, z):
+    """
+    Arithmetic average of GBM paths over their monitoring dates.
+
+    :param S0: Initial price.
+    :param r: Risk-free rate (drift under the pricing measure).
+    :param sigma: Volatility.
+    :param T: Horizon in years; the n_steps dates are T / n_steps apart.
+    :param z: Normal draws, shape (n_paths, n_steps).
+    :return: Array of n_paths averages.
+    """
+    z = np.ascontiguousarray(z, dtype=float)
+    dt = T / z.shape[1]
+    out = np.empty(z.shape[0])
+    _gbm_average_kernel(float(S0), (r - 0.5 * sigma**2) * dt, sigma * math.sqrt(dt), z, out)
+    return out
+
+
+def cir_euler_paths(r0, a, b, sigma, T, z):
+    """
+    Reflected Euler scheme of the CIR short rate, as in cir.simulate_cir_euler.
+
+    :param r0: Initial short rate.
+    :param a, b, sigma: Mean reversion speed, long-term mean and volatility.
+    :param T: Horizon in years; the n_steps steps are T / n_steps long.
+    :param z: Normal draws, shape (n_paths, n_steps).
+    :return: Array of n_paths rates at T.
+    """
+    z = np.ascontiguousarray(z, dtype=float)
+    out = np.empty(z.shape[0])
+    _cir_euler_kernel(float(r0), a, b, sigma, T / z.shape[1], z, out)
+    return out
+
+
+set_backend('numba' if NUMBA_AVAILABLE else 'numpy')
+
+
+if __name__ == '__main__':
+    from time import perf_counter
+    from .black_scholes import BS_chain
+    rng = np.random.default_rng(0)
+    n_quotes = 200000
+    S = rng.uniform(50, 150, n_quotes)
+    K = rng.uniform(50, 150, n_quotes)
+    T = rng.uniform(0.05, 3.0, n_quotes)
+    sigma = rng.uniform(0.05, 0.8, n_quotes)
+    is_call = rng.random(n_quotes) < 0.5
+    prices = BS_chain(S, K, T, 0.03, sigma, 0.01, is_call).price
+    z = rng.standard_normal((20000, 250))
+    cases = {
+        'implied_vol': (n_quotes, lambda: implied_vol(prices, S, K, T, 0.03, 0.01, is_call, 1e-10)[0]),
+        'gbm_path_average': (z.size, lambda: gbm_path_average(100.0, 0.03, 0.2, 1.0, z)),
+        'cir_euler_paths': (z.size, lambda: cir_euler_paths(0.04, 0.2, 0.05, 0.1, 0.25, z)),
+    }
+    print("numba", "available" if NUMBA_AVAILABLE else "not installed, numpy backend only")
+    results = {}
+    for backend in sorted(_BACKENDS):
+        set_backend(backend)
+        for name, (n_items, run) in cases.items():
+            run()  # compile on first call
+            t0 = perf_counter()
+            results[backend, name] = run()
+            elapsed = perf_counter() - t0
+            print(f"{backend:6s} {name:18s} {n_items / elapsed:10.3g} items/s")
+    # implied vols are only comparable where the price carries information about sigma
+    informative = BS_chain(S, K, T, 0.03, sigma, 0.01, is_call).vega > 1e-3
+    if NUMBA_AVAILABLE:
+        for name in cases:
+            a, b = results['numpy', name], results['numba', name]
+            if name == 'implied_vol':
+                a, b = a[informative], b[informative]
+            print(f"parity {name:18s} max relative difference {np.max(np.abs(a - b) / np.abs(a)):.1e}")
+    print("implied_vol max error vs input sigma:",
+          np.max(np.abs(results[get_backend(), 'implied_vol'] - sigma)[informative]))
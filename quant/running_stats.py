@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+Running mean and covariance of a stream of samples.
+
+Monte Carlo engines feed one block of samples at a time, so the path count
+is bounded by the requested accuracy instead of by memory. Blocks and whole
+accumulators are combined with the pairwise update of Chan, Golub and
+LeVeque, which stays accurate where naive sums of squares would cancel, and
+gives the same result for the same sequence of merges.
+"""
+import numpy as np
+
+
+class RunningStats(object):
+    """
+    Accumulate count, mean and co-moment matrix of `dim`-dimensional samples.
+
+    Columns are the quantities estimated from the same paths (e.g. payoff and
+    control variate, or price and Greeks); their cross-covariances are kept
+    so that control-variate coefficients can be computed at the end.
+    """
+    def __init__(self, dim=1):
+        self.dim = dim
+        self.count = 0
+        self.mean = np.zeros(dim)
+        # sum over samples of outer(x - mean, x - mean)
+        self.comoment = np.zeros((dim, dim))
+
+    def update(self, samples):
+        """
+        Add a block of samples, shape (n,) when dim is 1 or (n, dim).
+        Statistics are accumulated in float64 whatever the sample dtype.
+        """
+        x = np.asarray(samples, dtype=np.float64).reshape(len(samples), self.dim)
+        if x.shape[0] == 0:
+            return
+        block_mean = x.mean(axis=0)
+        dev = x - block_mean
+        self._combine(x.shape[0], block_mean, np.dot(dev.T, dev))
+
+    def merge(self, other):
+        """Add the statistics of another accumulator, e.g. from another worker."""
+        if other.count:
+            self._combine(other.count, other.mean, other.comoment)
+
+    def _combine(self, count, mean, comoment):
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean = self.mean + delta * (count / total)
+        self.comoment = self.comoment + comoment + np.outer(delta, delta) * (self.count * count / total)
+        self.count = total
+
+    def covariance(self, ddof=0):
+        """Sample covariance matrix of the columns."""
+        return self.comoment / (self.count - ddof)
+
+    def variance(self, ddof=0):
+        """Sample variance of each column."""
+        return np.diag(self.comoment) / (self.count - ddof)
+
+    def standard_error(self):
+        """Standard error of the mean of each column."""
+        return np.sqrt(self.variance() / self.count)
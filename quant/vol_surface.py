@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+Implied volatility surface from a chain of option quotes.
+
+build_vol_surface inverts the whole chain with Implied_vol_chain and fits a
+raw SVI smile to each expiry,
+
+    w(k) = a + b (rho (k - m) + sqrt((k - m)^2 + s^2)),
+
+where w = sigma^2 T is the total implied variance and k = log(K / F) the log
+forward moneyness. For fixed (m, s) the smile is linear in
+(a, b * rho * s, b * s), so the fit profiles over an (m, s) grid with batched
+linear least squares and then refines locally, as in curve_calibration.
+
+Between expiries the surface interpolates total variance linearly in T at
+fixed k, after flooring each slice at the running maximum of the earlier
+slices, so w is non-decreasing in T and the interpolated surface has no
+calendar arbitrage.
+Before the first expiry w is scaled down to 0 at T = 0, after the last one
+the implied volatility of the last slice is kept.
+"""
+import numpy as np
+from .black_scholes import Implied_vol_chain, IV_CONVERGED
+
+
+def svi_total_variance(k, a, b, rho, m, s):
+    """Raw SVI total implied variance at log forward moneyness k."""
+    x = k - m
+    return a + b * (rho * x + np.sqrt(x * x + s * s))
+
+
+def fit_svi(k, w, n_refine=4):
+    """
+    Least-squares fit of a raw SVI smile to total variances w at moneyness k.
+
+    Parameters:
+    k : array_like
+        Log forward moneyness log(K / F) of the quotes.
+    w : array_like
+        Total implied variance sigma^2 T of the quotes.
+    n_refine : int, optional
+        Number of local refinement rounds around the best grid point. Default is 4.
+
+    Returns:
+    tuple
+        (a, b, rho, m, s). Only parameters with b >= 0, |rho| <= 1 and a
+        non-negative minimum variance are accepted.
+    """
+    k = np.asarray(k, dtype=float)
+    w = np.asarray(w, dtype=float)
+    span = max(k.max() - k.min(), 0.1)
+    m_grid, s_grid = np.meshgrid(np.linspace(k.min(), k.max(), 15), np.geomspace(0.01 * span, 2 * span, 15))
+    candidates = np.column_stack([m_grid.ravel(), np.log(s_grid.ravel())])
+    best, best_sse = _svi_candidates(k, w, candidates)
+    center = candidates[np.argmin(best_sse)]
+    width = np.array([span / 14, np.log(2 * span / (0.01 * span)) / 14])
+    steps = np.linspace(-1.0, 1.0, 5)
+    offsets = np.stack(np.meshgrid(steps, steps, indexing='ij'), axis=-1).reshape(-1, 2)
+    params, sse = best[np.argmin(best_sse)], best_sse.min()
+    for i in range(n_refine):
+        local, local_sse = _svi_candidates(k, w, center + width * offsets)
+        j = np.argmin(local_sse)
+        if local_sse[j] < sse:
+            params, sse, center = local[j], local_sse[j], (center + width * offsets)[j]
+        width = width * 0.4
+    return tuple(params)
+
+
+def _svi_candidates(k, w, candidates):
+    # linear least squares of w on [1, y, sqrt(y^2 + 1)], y = (k - m) / s, for every (m, log s)
+    m = candidates[:, :1]
+    s = np.exp(candidates[:, 1:])
+    y = (k - m) / s
+    root = np.sqrt(y * y + 1)
+    # normal equations from the moment sums, without materializing the design matrices
+    n = float(k.size)
+    sum_y, sum_root, sum_yy, sum_y_root = y.sum(1), root.sum(1), (y * y).sum(1), (y * root).sum(1)
+    XtX = np.stack([np.stack([np.full_like(sum_y, n), sum_y, sum_root], -1),
+                    np.stack([sum_y, sum_yy, sum_y_root], -1),
+                    np.stack([sum_root, sum_y_root, sum_yy + n], -1)], -2) + 1e-12 * np.eye(3)
+    Xtw = np.stack([np.full_like(sum_y, w.sum()), np.dot(y, w), np.dot(root, w)], -1)
+    coef = np.linalg.solve(XtX, Xtw[..., None])[..., 0]
+    sse = np.dot(w, w) - np.einsum('gp,gp->g', coef, Xtw)
+    a, d, c = coef.T
+    # c = b s >= 0, |d| = |rho| b s <= c, minimum of the smile a + sqrt(c^2 - d^2) >= 0
+    feasible = (c >= 0) & (np.abs(d) <= c) & (a + np.sqrt(np.maximum(c * c - d * d, 0.0)) >= 0)
+    sse = np.where(feasible, sse, np.inf)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        params = np.column_stack([a, c / s[:, 0], np.where(c > 0, d / c, 0.0), m[:, 0], s[:, 0]])
+    return params, sse
+
+
+class VolSurface(object):
+    """
+    SVI slices on a set of expiries with calendar-arbitrage-free interpolation.
+
+    :param expiries: Sorted expiries of the slices, in years.
+    :param params: Array (n_expiries, 5) of SVI (a, b, rho, m, s) per slice.
+    :param S: Spot price.
+    :param r: Flat risk-free rate or a yield_curve.TermStructure.
+    :param q: Dividend yield. Default is 0.
+    """
+    def __init__(self, expiries, params, S, r, q=0.0):
+        self.expiries = np.asarray(expiries, dtype=float)
+        self.params = np.asarray(params, dtype=float)
+        self.S = S
+        self.r = r
+        self.q = q
+
+    def forward(self, T):
+        """Forward price of the underlying for expiry T."""
+        T = np.asarray(T, dtype=float)
+        if hasattr(self.r, 'discount_factor'):
+            return self.S * np.exp(-self.q * T) / self.r.discount_factor(T)
+        return self.S * np.exp((self.r - self.q) * T)
+
+    def _slice_variance(self, i, k):
+        a, b, rho, m, s = self.params[i].T
+        return svi_total_variance(k, a, b, rho, m, s)
+
+    def total_variance(self, k, T):
+        """Total implied variance at log forward moneyness k and expiry T (broadcast)."""
+        k, T = np.broadcast_arrays(np.asarray(k, dtype=float), np.asarray(T, dtype=float))
+        last = self.expiries.size - 1
+        hi = np.clip(np.searchsorted(self.expiries, T), 0, last)
+        lo = np.maximum(hi - 1, 0)
+        # floor every slice at the running maximum of the earlier ones: w is non-decreasing in T
+        running = np.full(k.shape, -np.inf)
+        w_lo, w_hi = np.zeros(k.shape), np.zeros(k.shape)
+        for i in range(last + 1):
+            running = np.maximum(running, self._slice_variance(i, k))
+            w_lo = np.where(lo == i, running, w_lo)
+            w_hi = np.where(hi == i, running, w_hi)
+        T_lo, T_hi = self.expiries[lo], self.expiries[hi]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            weight = np.where(T_hi > T_lo, (T - T_lo) / (T_hi - T_lo), 0.0)
+            w = w_lo + weight * (w_hi - w_lo)
+            # before the first expiry scale to zero at T = 0, after the last keep its implied vol
+            w = np.where(T < self.expiries[0], w_hi * T / self.expiries[0], w)
+            w = np.where(T > self.expiries[-1], w_hi * T / self.expiries[-1], w)
+        return w
+
+    def vol(self, K, T):
+        """Implied volatility at strike K and expiry T, vectorized over both."""
+        T = np.asarray(T, dtype=float)
+        k = np.log(np.asarray(K, dtype=float) / self.forward(T))
+        return np.sqrt(self.total_variance(k, T) / T)
+
+
+def build_vol_surface(option_price, S, K, T, r, q=0.0, is_call=True, min_quotes=5):
+    """
+    Invert a chain of quotes and fit an SVI smile per expiry.
+
+    Parameters:
+    option_price, K, T : array_like
+        Quotes, strikes and expiries of the chain.
+    S : float
+        Spot price.
+    r : float or TermStructure
+        Risk-free rate, flat or as a curve.
+    q : float, optional
+        Dividend yield. Default is 0.
+    is_call : bool or array_like of bool
+        True for calls, False for puts.
+    min_quotes : int, optional
+        Expiries with fewer converged quotes than this are skipped. Default is 5.
+
+    Returns:
+    VolSurface
+
+    Raises ValueError when no expiry has min_quotes converged quotes.
+    """
+    K, T = np.broadcast_arrays(np.asarray(K, dtype=float), np.asarray(T, dtype=float))
+    vols, status = Implied_vol_chain(option_price, S, K, T, r, q, is_call)
+    ok = status == IV_CONVERGED
+    K, T, vols = K[ok], T[ok], vols[ok]
+    surface = VolSurface([], np.empty((0, 5)), S, r, q)
+    expiries, params = [], []
+    for expiry in np.unique(T):
+        this = T == expiry
+        if this.sum() < min_quotes:
+            continue
+        k = np.log(K[this] / surface.forward(expiry))
+        expiries.append(expiry)
+        params.append(fit_svi(k, vols[this] ** 2 * expiry))
+    if not expiries:
+        raise ValueError("no expiry has %d converged quotes to fit a smile to" % min_quotes)
+    return VolSurface(expiries, params, S, r, q)
+
+
+if __name__ == '__main__':
+    from time import perf_counter
+    from .black_scholes import BS_chain
+    rng = np.random.default_rng(0)
+    S, r, q = 100.0, 0.03, 0.01
+    expiries = np.array([1 / 12, 0.25, 0.5, 1.0, 2.0])
+    true = np.array([[0.002, 0.04, -0.5, 0.05, 0.1],
+                     [0.006, 0.06, -0.45, 0.05, 0.15],
+                     [0.012, 0.08, -0.4, 0.05, 0.2],
+                     [0.025, 0.1, -0.35, 0.05, 0.25],
+                     [0.05, 0.12, -0.3, 0.05, 0.3]])
+    # a 50k-quote chain generated from known SVI slices
+    T = rng.choice(expiries, 50000)
+    K = S * np.exp(rng.uniform(-0.5, 0.5, T.size) * np.sqrt(T))
+    i = np.searchsorted(expiries, T)
+    k = np.log(K / (S * np.exp((r - q) * T)))
+    sigma = np.sqrt(svi_total_variance(k, *true[i].T) / T)
+    is_call = K > S
+    prices = BS_chain(S, K, T, r, sigma, q, is_call).price
+
+    t0 = perf_counter()
+    surface = build_vol_surface(prices, S, K, T, r, q, is_call)
+    print(f"built surface from {T.size} quotes in {(perf_counter() - t0) * 1000:.0f} ms,"
+          f" max vol error {np.max(np.abs(surface.vol(K, T) - sigma)):.1e}")
+    K_query = rng.uniform(60, 150, 2000000)
+    T_query = rng.uniform(0.02, 3.0, K_query.size)
+    t0 = perf_counter()
+    surface.vol(K_query, T_query)
+    elapsed = perf_counter() - t0
+    print(f"{K_query.size} vol queries in {elapsed * 1000:.0f} ms ({K_query.size / elapsed:.2e} per second)")
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+Bulk evaluation of Nelson-Siegel and Svensson curves on a fixed maturity grid.
+
+NS and SV recompute the exponentials and loading terms on every call. For a
+fixed grid and fixed decay parameters the curves are linear in the betas, so
+CurveEvaluator builds the stacked spot/forward loading matrix once and turns
+a whole batch of beta vectors (scenario curves, historical panels) into
+spot and forward curves with one matrix multiply. Loading matrices are kept
+in a bounded LRU cache keyed by (model, decay parameters, grid).
+
+TermStructure turns one NS/SV parameter set into a discount curve sampled on
+a dense uniform grid, so pricers can look up zero rates, discount factors
+and forward rates for a whole chain of expiries in one array operation.
+"""
+from collections import OrderedDict
+import numpy as np
+from .Nelson_Siegel import NS_loadings
+from .NSS import SV_loadings
+
+MODELS = {'NS': 1, 'SV': 2}  # model -> number of decay parameters
+
+
+class LoadingCache(object):
+    """
+    Bounded LRU cache of stacked [spot; forward] loading matrices.
+
+    hits and misses count lookups since creation (or the last clear()).
+    """
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def get(self, model, decay, m):
+        """
+        Return the (2 * len(m), n_betas) matrix whose first half gives the spot
+        curve and second half the forward curve. The matrix is read-only.
+        """
+        m = np.ascontiguousarray(m, dtype=float)
+        key = (model, decay, m.shape, m.tobytes())
+        loadings = self._data.get(key)
+        if loadings is not None:
+            self.hits += 1
+            self._data.move_to_end(key)
+            return loadings
+        self.misses += 1
+        if model == 'NS':
+            spot, forward = NS_loadings(decay[0], m)
+        else:
+            spot, forward = SV_loadings(decay[0], decay[1], m)
+        loadings = np.concatenate([spot.reshape(-1, spot.shape[-1]), forward.reshape(-1, forward.shape[-1])])
+        loadings.setflags(write=False)
+        self._data[key] = loadings
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+        return loadings
+
+    def clear(self):
+        """Drop every cached matrix and reset the counters."""
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+
+default_cache = LoadingCache()
+
+
+class CurveEvaluator(object):
+    """
+    Spot and forward curves of many beta vectors on one maturity grid.
+
+    :param model: 'NS' or 'SV'.
+    :param decay: lambda0 for NS, (tau1, tau2) for SV.
+    :param m: Maturity grid. Must be positive.
+    :param cache: LoadingCache to use. Default is the module-level default_cache.
+    """
+    def __init__(self, model, decay, m, cache=None):
+        if model not in MODELS:
+            raise ValueError("model must be 'NS' or 'SV'")
+        decay = tuple(float(x) for x in np.atleast_1d(decay))
+        if len(decay) != MODELS[model]:
+            raise ValueError("NS takes one decay parameter (lambda0), SV two (tau1, tau2)")
+        self.model = model
+        self.decay = decay
+        self.m = np.asarray(m, dtype=float)
+        self.loadings = (default_cache if cache is None else cache).get(model, decay, self.m)
+
+    def curves(self, betas):
+        """
+        Evaluate spot and forward curves.
+
+        :param betas: Array of shape (n_betas,) or (n_curves, n_betas), with n_betas 3 for NS, 4 for SV.
+        :return: Tuple (spot, forward), each of shape (len(m),) or (n_curves, len(m)).
+        """
+        both = np.dot(np.asarray(betas, dtype=float), self.loadings.T)
+        n = self.m.size
+        return both[..., :n], both[..., n:]
+
+    def spot(self, betas):
+        """Spot curves only, see curves()."""
+        return np.dot(np.asarray(betas, dtype=float), self.loadings[:self.m.size].T)
+
+    def forward(self, betas):
+        """Forward curves only, see curves()."""
+        return np.dot(np.asarray(betas, dtype=float), self.loadings[self.m.size:].T)
+
+
+class TermStructure(object):
+    """
+    Discount curve from Nelson-Siegel or Svensson parameters, for O(1) lookups.
+
+    The integrated forward I(t) = t * spot(t) and the instantaneous forward
+    f(t) are precomputed on a uniform grid of spacing `step` up to `t_max`.
+    A lookup is an index computation plus a linear interpolation, with no
+    search, so any array of expiries is served in one vectorized pass.
+    Interpolating I(t) linearly means a flat forward within each grid cell;
+    beyond t_max the instantaneous forward at t_max is held flat, by both
+    forward_rate and integrated_forward. Negative (or NaN)
+    expiries raise ValueError.
+
+    Rates are continuously compounded. BS_chain and Implied_vol_chain accept a
+    TermStructure in place of the flat rate r.
+
+    :param model: 'NS' or 'SV'.
+    :param betas: (beta0, beta1, beta2) for NS, (beta0, beta1, beta2, beta3) for SV.
+    :param decay: lambda0 for NS, (tau1, tau2) for SV.
+    :param t_max: Last grid maturity in years. Default is 50.
+    :param step: Grid spacing in years. Default is one day.
+    """
+    def __init__(self, model, betas, decay, t_max=50.0, step=1.0 / 365):
+        n = int(np.ceil(t_max / step))
+        self.step = t_max / n
+        self.t_max = t_max
+        t = np.arange(1, n + 1) * self.step
+        spot, forward = CurveEvaluator(model, decay, t).curves(betas)
+        # both models have spot(0) = forward(0) = beta0 + beta1
+        short_rate = betas[0] + betas[1]
+        self._integrated = np.concatenate([[0.0], t * spot])
+        self._forward = np.concatenate([[short_rate], forward])
+
+    def _locate(self, T):
+        x = np.asarray(T, dtype=float) / self.step
+        # a negative index would silently wrap around to the long end of the grid
+        if not np.all(x >= 0):
+            raise ValueError("expiries T must be non-negative")
+        idx = np.minimum(x.astype(np.intp), self._integrated.size - 2)
+        # past the grid the weight stops at the last node, see integrated_forward for the rest
+        return idx, np.minimum(x - idx, 1.0)
+
+    def integrated_forward(self, T):
+        """Integral of the instantaneous forward from 0 to T, i.e. -log of the discount factor."""
+        idx, w = self._locate(T)
+        integrated = self._integrated[idx] + w * (self._integrated[idx + 1] - self._integrated[idx])
+        # flat forward beyond t_max, so that forward_rate stays -d log(DF) / dT there
+        return integrated + np.maximum(np.asarray(T, dtype=float) - self.t_max, 0.0) * self._forward[-1]
+
+    def discount_factor(self, T):
+        """Discount factors exp(-I(T))."""
+        return np.exp(-self.integrated_forward(T))
+
+    def zero_rate(self, T):
+        """Continuously compounded zero rates I(T) / T; the short rate at T = 0."""
+        T = np.asarray(T, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(T > 0, self.integrated_forward(T) / T, self._forward[0])
+
+    def forward_rate(self, T):
+        """Instantaneous forward rates f(T)."""
+        idx, w = self._locate(T)
+        return self._forward[idx] + w * (self._forward[idx + 1] - self._forward[idx])
+
+
+if __name__ == '__main__':
+    from time import perf_counter
+    from .NSS import SV
+    m = np.linspace(0.1, 30, 360)
+    betas = np.random.default_rng(0).normal([0.04, -0.02, 0.01, 0.015], 0.005, (10000, 4))
+
+    t0 = perf_counter()
+    for b in betas:
+        SV(b[0], b[1], b[2], b[3], 1.5, 9.0, m)
+    loop = perf_counter() - t0
+    t0 = perf_counter()
+    spot, forward = CurveEvaluator('SV', (1.5, 9.0), m).curves(betas)
+    batch = perf_counter() - t0
+    print(f"SV on {m.size} maturities x {len(betas)} beta vectors: loop {loop * 1000:.0f} ms,"
+          f" CurveEvaluator {batch * 1000:.1f} ms")
+    print("max difference:", np.max(np.abs(spot[-1] - SV(*betas[-1], 1.5, 9.0, m)[0])))
+    CurveEvaluator('SV', (1.5, 9.0), m)
+    CurveEvaluator('NS', 2.0, m).curves(betas[:, :3])
+    print(f"cache: {default_cache.hits} hits, {default_cache.misses} misses, {len(default_cache)} entries")
+
+    curve = TermStructure('SV', (0.04, -0.02, 0.01, 0.015), (1.5, 9.0))
+    expiries = np.random.default_rng(1).uniform(0.01, 30, 1000000)
+    t0 = perf_counter()
+    rates = curve.zero_rate(expiries)
+    print(f"TermStructure: {expiries.size} zero-rate lookups in {(perf_counter() - t0) * 1000:.1f} ms,"
+          f" max error {np.max(np.abs(rates - SV(0.04, -0.02, 0.01, 0.015, 1.5, 9.0, expiries)[0])):.1e}")
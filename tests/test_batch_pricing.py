@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+import csv
+import numpy as np
+import pytest
+from quant.batch_pricing import generate_book, main, price_book
+from quant.black_scholes import BS_chain, ChainGreeks
+
+N_ROWS = 1000
+
+
+def _read_csv(path):
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        columns = list(zip(*reader))
+    return {name: np.array(column) for name, column in zip(header, columns)}
+
+
+@pytest.fixture(scope='module')
+def book(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('book') / 'trades.csv')
+    generate_book(path, N_ROWS, chunk_size=300)
+    return path
+
+
+@pytest.mark.parametrize('n_workers', [1, 2])
+def test_round_trip_matches_bs_chain(book, tmp_path, n_workers):
+    output = str(tmp_path / 'priced.csv')
+    run = price_book(book, output, chunk_size=128, n_workers=n_workers)
+    assert run.rows == N_ROWS
+    trades, priced = _read_csv(book), _read_csv(output)
+    # input columns are copied through in input order
+    for name, values in trades.items():
+        np.testing.assert_array_equal(priced[name], values)
+    S, K, T, r, sigma, q = (trades[name].astype(float) for name in ('S', 'K', 'T', 'r', 'sigma', 'q'))
+    expected = BS_chain(S, K, T, r, sigma, q, trades['type'] == 'call')
+    for name, values in zip(ChainGreeks._fields, expected):
+        np.testing.assert_allclose(priced[name].astype(float), values, rtol=1e-12, atol=1e-12)
+
+
+def test_missing_columns(tmp_path):
+    trades = tmp_path / 'trades.csv'
+    trades.write_text("S,K,T,sigma\n100,100,1,0.2\n")
+    with pytest.raises(ValueError, match='missing column.*r'):
+        price_book(str(trades), str(tmp_path / 'priced.csv'), n_workers=1)
+
+
+def test_cli(book, tmp_path, capsys):
+    output = tmp_path / 'priced.csv'
+    main([book, str(output), '--chunk-size', '256', '--workers', '1'])
+    assert capsys.readouterr().out.startswith('priced %d rows' % N_ROWS)
+    assert len(output.read_text().splitlines()) == N_ROWS + 1
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+from quant import bsm
+
+S0, K, T, r, sigma = 100.0, 105.0, 1.0, 0.03, 0.2
+
+
+@pytest.mark.parametrize('method', ['plain', 'antithetic', 'control_variate'])
+@pytest.mark.parametrize('S', [S0, np.float64(S0), np.array(S0)])
+def test_float32_paths_stay_float32(monkeypatch, method, S):
+    # every simulated terminal price reaches option_payoff, record the dtypes it sees
+    seen = []
+    payoff = bsm.option_payoff
+    monkeypatch.setattr(bsm, 'option_payoff', lambda ST, *args: seen.append(ST.dtype) or payoff(ST, *args))
+    z = np.random.default_rng(0).standard_normal(1000, dtype=np.float32)
+    samples = bsm._discounted_samples(z, S, K, T, r, sigma, 'call', 1.0, method, 'stock')
+    assert samples.dtype == np.float32
+    assert seen and all(dtype == np.float32 for dtype in seen)
+
+
+@pytest.mark.parametrize('method', ['plain', 'antithetic', 'control_variate'])
+def test_parallel_is_reproducible_for_any_worker_count(method):
+    args = (S0, K, T, r, sigma, 100001, 'call', 1.0, method)
+    one = bsm.monte_carlo_option_pricing_parallel(*args, seed=3, n_workers=1, block_size=2**14)
+    two = bsm.monte_carlo_option_pricing_parallel(*args, seed=3, n_workers=2, block_size=2**14)
+    assert (one.price, one.standard_error, one.n_paths) == (two.price, two.standard_error, two.n_paths)
+    assert one.n_paths == (100002 if method == 'antithetic' else 100001)
+    other = bsm.monte_carlo_option_pricing_parallel(*args, seed=4, n_workers=1, block_size=2**14)
+    assert other.price != one.price
+    exact = bsm.BSMAnalytical('C', S0, K, T, r, sigma)
+    assert abs(one.price - exact) < 4 * one.standard_error
+
+
+@pytest.mark.parametrize('option_type', ['call', 'put', 'digital_call', 'digital_put'])
+@pytest.mark.parametrize('method, control', [('antithetic', None), ('control_variate', 'analytical'),
+                                             ('control_variate', 'stock'), ('moment_matching', None)])
+def test_variance_reduction_is_unbiased_and_reduces_error(option_type, method, control):
+    M = 200000
+    exact = bsm.BSMAnalytical(bsm.ANALYTICAL_CODES[option_type], S0, K, T, r, sigma)
+    plain = bsm.monte_carlo_option_pricing(S0, K, T, r, sigma, M, option_type, rng=np.random.default_rng(5))
+    result = bsm.monte_carlo_option_pricing(S0, K, T, r, sigma, M, option_type, method=method,
+                                            control=control or 'analytical', full_output=True,
+                                            rng=np.random.default_rng(6))
+    assert abs(result.price - exact) < 4 * result.standard_error
+    assert result.n_paths == M
+    if method != 'moment_matching':
+        assert result.standard_error < plain[1]
+
+
+def test_streaming_stops_at_target_error():
+    result = bsm.monte_carlo_option_pricing_streaming(S0, K, T, r, sigma, target_error=0.05, chunk_size=2**12,
+                                                      rng=np.random.default_rng(7))
+    assert result.standard_error <= 0.05
+    assert result.n_paths % 2**12 == 0 and result.n_paths < 10**8
+    # one chunk fewer would not have reached the target
+    assert result.standard_error * np.sqrt(result.n_paths / (result.n_paths - 2**12)) > 0.05 * 0.98
+    assert abs(result.price - bsm.BSMAnalytical('C', S0, K, T, r, sigma)) < 4 * result.standard_error
+
+
+@pytest.mark.parametrize('method, n_paths', [('plain', 10000), ('antithetic', 10000), ('control_variate', 10000)])
+def test_streaming_stops_at_max_paths(method, n_paths):
+    result = bsm.monte_carlo_option_pricing_streaming(S0, K, T, r, sigma, method=method, max_paths=n_paths - 1,
+                                                      chunk_size=3000, rng=np.random.default_rng(8))
+    # antithetic pairs round an odd path budget up to the next pair
+    assert result.n_paths == (n_paths if method == 'antithetic' else n_paths - 1)
+
+
+def test_streaming_matches_one_shot_pricing_on_the_same_draws():
+    streamed = bsm.monte_carlo_option_pricing_streaming(S0, K, T, r, sigma, max_paths=50000, chunk_size=7000,
+                                                        rng=np.random.default_rng(9))
+    full = bsm.monte_carlo_option_pricing(S0, K, T, r, sigma, 50000, rng=np.random.default_rng(9))
+    np.testing.assert_allclose((streamed.price, streamed.standard_error), full, rtol=1e-12)
+
+
+def test_streaming_rejects_moment_matching():
+    with pytest.raises(ValueError):
+        bsm.monte_carlo_option_pricing_streaming(S0, K, T, r, sigma, method='moment_matching')
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+from quant.Nelson_Siegel import NS
+from quant.NSS import SV
+from quant.curve_calibration import calibrate_NS, calibrate_SV
+
+M = np.array([0.25, 0.5, 1, 2, 3, 5, 7, 10, 15, 20, 30])
+NS_BETAS = np.array([[0.04, -0.02, 0.01], [0.05, -0.03, -0.02], [0.03, 0.01, 0.02]])
+NS_LAMBDAS = np.array([0.8, 2.0, 5.0])
+SV_BETAS = np.array([[0.04, -0.02, 0.01, 0.015], [0.05, -0.03, -0.02, 0.02]])
+SV_TAUS = np.array([[1.5, 9.0], [0.7, 4.0]])
+
+
+def _ns_yields():
+    return NS(NS_BETAS[:, :1], NS_BETAS[:, 1:2], NS_BETAS[:, 2:], NS_LAMBDAS[:, None], M)[0]
+
+
+def test_ns_recovers_known_curves():
+    fit = calibrate_NS(M, _ns_yields())
+    np.testing.assert_allclose(fit.decay, NS_LAMBDAS, rtol=2e-3)
+    np.testing.assert_allclose(fit.betas, NS_BETAS, atol=1e-5)
+    assert np.all(fit.rmse < 1e-6)
+
+
+def test_ns_warm_start_and_coarse_uneven_grid():
+    Y = _ns_yields()
+    warm = calibrate_NS(M, Y, initial_decay=NS_LAMBDAS * 1.1)
+    np.testing.assert_allclose(warm.decay, NS_LAMBDAS, rtol=2e-3)
+    # the local steps follow the spacing of whatever grid is given
+    coarse = calibrate_NS(M, Y, lambda_grid=[0.5, 0.7, 1.0, 3.0, 10.0], n_refine=12)
+    np.testing.assert_allclose(coarse.decay, NS_LAMBDAS, rtol=2e-3)
+
+
+def test_sv_recovers_known_curves():
+    Y = SV(SV_BETAS[:, :1], SV_BETAS[:, 1:2], SV_BETAS[:, 2:3], SV_BETAS[:, 3:], SV_TAUS[:, :1], SV_TAUS[:, 1:], M)[0]
+    fit = calibrate_SV(M, Y, n_refine=10)
+    np.testing.assert_allclose(fit.decay, SV_TAUS, rtol=1e-3)
+    np.testing.assert_allclose(fit.betas, SV_BETAS, atol=1e-4)
+    assert np.all(fit.rmse < 1e-7)
+
+
+def test_single_curve():
+    fit = calibrate_NS(M, _ns_yields()[0])
+    assert fit.betas.shape == (1, 3)
+    assert fit.decay[0] == pytest.approx(NS_LAMBDAS[0], rel=2e-3)
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+import pytest
+
+pytest.importorskip('tkinter')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'GUI'))
+import Combined_Option_Calculator as gui
+
+
+class _Widget(object):
+    # stands in for the ttk entries, variables and labels the callbacks read and write
+    def __init__(self, value=''):
+        self.value = value
+        self.text = None
+
+    def get(self):
+        return self.value
+
+    def config(self, text=None):
+        self.text = text
+
+
+@pytest.fixture
+def inputs(monkeypatch):
+    widgets = {'entry_S': '100', 'entry_K': '100', 'entry_T': '1', 'entry_r': '5', 'entry_sigma': '20',
+               'var_option_type': 'call', 'var_option_style': 'vanilla'}
+    widgets = {name: _Widget(value) for name, value in widgets.items()}
+    for name in ('label_price', 'label_delta', 'label_vega', 'label_gamma', 'label_theta', 'label_rho'):
+        widgets[name] = _Widget()
+    for name, widget in widgets.items():
+        monkeypatch.setattr(gui, name, widget, raising=False)
+    monkeypatch.setattr(gui, 'plot_graphs', lambda *args: None)
+    return widgets
+
+
+@pytest.mark.parametrize('style', ['vanilla', 'digital'])
+@pytest.mark.parametrize('entry, value', [('entry_T', '0'), ('entry_K', '0'), ('entry_sigma', '0'),
+                                          ('entry_S', '-1'), ('entry_T', '0.')])
+def test_live_update_skips_non_positive_inputs(inputs, style, entry, value):
+    inputs['var_option_style'].value = style
+    inputs[entry].value = value
+    gui.calculate_option(show_errors=False)
+    assert inputs['label_price'].text is None
+
+
+def test_valid_inputs_update_the_labels(inputs):
+    gui.calculate_option(show_errors=False)
+    assert inputs['label_price'].text.endswith('10.45')
+
+
+@pytest.mark.parametrize('style', ['vanilla', 'digital'])
+def test_parallel_monte_carlo_is_reproducible_for_any_worker_count(style):
+    args = (100.0, 105.0, 1.0, 0.03, 0.2, 'call', style, 50000)
+    one = gui.monte_carlo_parallel(*args, seed=11, n_workers=1, block_size=2**13)
+    two = gui.monte_carlo_parallel(*args, seed=11, n_workers=2, block_size=2**13)
+    assert one == two
+    assert gui.monte_carlo_parallel(*args, seed=12, n_workers=1, block_size=2**13) != one
+    exact = gui.black_scholes(*args[:5])[0] if style == 'vanilla' else gui.digital_option(*args[:5], 'call')
+    assert abs(one[0] - exact) < 4 * one[1]
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+import warnings
+import numpy as np
+from quant.black_scholes import BS_chain, Implied_vol_chain, IV_CONVERGED, IV_MAX_ITERATION, IV_OUT_OF_BOUNDS
+
+
+def test_round_trip():
+    rng = np.random.default_rng(0)
+    n = 20000
+    S = rng.uniform(50, 150, n)
+    K = S * rng.uniform(0.8, 1.2, n)
+    T = rng.uniform(0.1, 3.0, n)
+    sigma = rng.uniform(0.05, 0.8, n)
+    is_call = rng.random(n) < 0.5
+    greeks = BS_chain(S, K, T, 0.03, sigma, 0.01, is_call)
+    vols, status = Implied_vol_chain(greeks.price, S, K, T, 0.03, 0.01, is_call, precision=1e-10)
+    # a price only determines sigma where it is sensitive to it
+    informative = greeks.vega > 1e-3
+    assert np.all(status[informative] == IV_CONVERGED)
+    np.testing.assert_allclose(vols[informative], sigma[informative], atol=1e-6)
+
+
+def test_expired_quotes_are_out_of_bounds_without_warnings():
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        vols, status = Implied_vol_chain([5.0, 5.0, 0.0], 100.0, 100.0, [0.0, -0.5, 0.0], 0.03)
+    assert np.all(status == IV_OUT_OF_BOUNDS)
+    assert np.all(np.isnan(vols))
+
+
+def test_prices_outside_no_arbitrage_bounds():
+    # below intrinsic, above the discounted spot (call) / strike (put), and not a number
+    prices = [1.0, 150.0, 120.0, np.nan]
+    is_call = [True, True, False, True]
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        vols, status = Implied_vol_chain(prices, 110.0, 100.0, 1.0, 0.03, 0.0, is_call)
+    assert np.all(status == IV_OUT_OF_BOUNDS)
+    assert np.all(np.isnan(vols))
+
+
+def test_valid_quotes_unaffected_by_invalid_neighbours():
+    price = BS_chain(100.0, 100.0, 1.0, 0.03, 0.25).price
+    vols, status = Implied_vol_chain([price, 5.0, price], 100.0, 100.0, [1.0, 0.0, 1.0], 0.03, precision=1e-10)
+    np.testing.assert_array_equal(status, [IV_CONVERGED, IV_OUT_OF_BOUNDS, IV_CONVERGED])
+    np.testing.assert_allclose(vols[[0, 2]], 0.25, atol=1e-8)
+
+
+def test_root_outside_the_search_range_is_out_of_bounds():
+    # within the no-arbitrage bounds, but implied by a vol above sigma_max or below sigma_min
+    F = 100.0 * np.exp(0.03)
+    prices = BS_chain(100.0, [100.0, F], 1.0, 0.03, [1.5, 1e-8]).price
+    vols, status = Implied_vol_chain(prices, 100.0, [100.0, F], 1.0, 0.03, sigma_max=1.0)
+    np.testing.assert_array_equal(status, [IV_OUT_OF_BOUNDS, IV_OUT_OF_BOUNDS])
+    assert np.all(np.isnan(vols))
+    # the default range recovers the high vol
+    vols, status = Implied_vol_chain(prices[0], 100.0, 100.0, 1.0, 0.03, precision=1e-10)
+    assert status == IV_CONVERGED and abs(vols - 1.5) < 1e-8
+
+
+def test_unattainable_precision_is_not_converged():
+    price = BS_chain(100.0, 100.0, 1.0, 0.03, 0.25).price
+    vols, status = Implied_vol_chain(price + 1e-11, 100.0, 100.0, 1.0, 0.03, precision=1e-16)
+    assert status == IV_MAX_ITERATION
+    assert abs(vols - 0.25) < 1e-9
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+Import-time budget of the quant package.
+
+Every scenario runs in a fresh interpreter (an import is only cold once),
+a few times, and the fastest run is compared with its budget. A scenario
+also fails when one of its forbidden heavy modules was imported. Set
+QUANT_IMPORT_BUDGET_SCALE (e.g. 2) to relax the budgets on a slow machine.
+"""
+import json
+import os
+import subprocess
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCALE = float(os.environ.get('QUANT_IMPORT_BUDGET_SCALE', '1'))
+REPEAT = 5
+IMPORT_BUDGET_MS = 20.0
+
+# name -> (statements timed, budget in ms, modules that must not be loaded afterwards)
+SCENARIOS = {
+    'scalar BS price': ("import quant\nquant.BS('C', 100.0, 100.0, 1.0, 0.03, 0.2, 0.0).BSM()",
+                        250.0, ('scipy', 'matplotlib', 'tkinter')),
+    'first BS_chain': ("import quant\nquant.BS_chain(100.0, [90.0, 100.0, 110.0], 1.0, 0.03, 0.2)",
+                       600.0, ('matplotlib', 'tkinter')),
+}
+
+_PROBE = """
+import sys
+from time import perf_counter
+t0 = perf_counter()
+exec(compile(sys.argv[1], '<scenario>', 'exec'))
+elapsed = perf_counter() - t0
+import json
+print(json.dumps({'ms': elapsed * 1000, 'modules': sorted(sys.modules)}))
+"""
+
+
+def _run(args):
+    return subprocess.run([sys.executable] + args, cwd=ROOT, capture_output=True, text=True, check=True)
+
+
+def _import_time_ms():
+    # cumulative time of the quant line of -X importtime, in microseconds
+    stderr = _run(['-X', 'importtime', '-c', 'import quant']).stderr
+    for line in stderr.splitlines():
+        fields = line.split('|')
+        if len(fields) == 3 and fields[2].strip() == 'quant':
+            return int(fields[1]) / 1000
+    raise AssertionError("quant not found in the -X importtime output:\n" + stderr)
+
+
+def _measure(statements):
+    best, modules = float('inf'), ()
+    for i in range(REPEAT):
+        result = json.loads(_run(['-c', _PROBE, statements]).stdout)
+        if result['ms'] < best:
+            best, modules = result['ms'], result['modules']
+    return best, modules
+
+
+def test_import_quant_within_budget():
+    ms = min(_import_time_ms() for i in range(REPEAT))
+    assert ms <= IMPORT_BUDGET_MS * SCALE, f"import quant took {ms:.1f} ms"
+
+
+def test_import_quant_loads_no_heavy_modules():
+    modules = json.loads(_run(['-c', _PROBE, 'import quant']).stdout)['modules']
+    loaded = [m for m in ('numpy', 'scipy', 'matplotlib', 'tkinter') if m in modules]
+    assert not loaded, "import quant imported " + ", ".join(loaded)
+
+
+def test_import_quant_leaves_sys_path_alone():
+    paths = json.loads(_run(['-c', 'import json, sys\nbefore = list(sys.path)\nimport quant\n'
+                                   'print(json.dumps([before, sys.path]))']).stdout)
+    assert paths[0] == paths[1]
+
+
+@pytest.mark.parametrize('name', sorted(SCENARIOS))
+def test_first_use_within_budget(name):
+    statements, budget, forbidden = SCENARIOS[name]
+    ms, modules = _measure(statements)
+    loaded = [m for m in forbidden if m in modules]
+    assert not loaded, f"{name} imported " + ", ".join(loaded)
+    assert ms <= budget * SCALE, f"{name} took {ms:.1f} ms (budget {budget * SCALE:.0f} ms)"
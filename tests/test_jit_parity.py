@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+The numba backend compiles the plain-Python loops in jit_kernels, so running those loops
+uncompiled against the numpy kernels checks backend parity without needing numba.
+"""
+import warnings
+import numpy as np
+import pytest
+from quant import jit_kernels
+from quant.black_scholes import BS_chain, Implied_vol_chain, IV_CONVERGED, IV_OUT_OF_BOUNDS
+
+# math.erfc in the loops vs ndtr in numpy: equal within rounding, not bit for bit
+PATH_RTOL = 1e-12
+PRECISION = 1e-10
+VOL_ATOL = 1e-6
+
+
+# the plain-Python loop behind Implied_vol_chain's interface, as the numba backend runs it compiled
+loop_implied_vol = jit_kernels._loop_implied_vol(jit_kernels._implied_vol_loop)
+
+
+@pytest.fixture(scope='module')
+def chain():
+    rng = np.random.default_rng(0)
+    n_quotes = 2000
+    S, K = rng.uniform(50, 150, n_quotes), rng.uniform(50, 150, n_quotes)
+    T, sigma = rng.uniform(0.05, 3.0, n_quotes), rng.uniform(0.05, 0.8, n_quotes)
+    is_call = rng.random(n_quotes) < 0.5
+    result = BS_chain(S, K, T, 0.03, sigma, 0.01, is_call)
+    return result.price, S, K, T, is_call, sigma, result.vega
+
+
+def test_implied_vol_parity(chain):
+    price, S, K, T, is_call, sigma, vega = chain
+    loop_vol, loop_status = loop_implied_vol(price, S, K, T, 0.03, 0.01, is_call, PRECISION, 100)
+    numpy_vol, numpy_status = Implied_vol_chain(price, S, K, T, 0.03, 0.01, is_call, PRECISION, 100)
+    np.testing.assert_array_equal(loop_status, numpy_status)
+    # implied vols are only comparable where the price carries information about sigma
+    informative = vega > 1e-3
+    assert np.all(numpy_status[informative] == IV_CONVERGED)
+    np.testing.assert_allclose(loop_vol[informative], numpy_vol[informative], rtol=0, atol=VOL_ATOL)
+    np.testing.assert_allclose(numpy_vol[informative], sigma[informative], rtol=0, atol=VOL_ATOL)
+
+
+@pytest.mark.parametrize('solver', [loop_implied_vol, Implied_vol_chain])
+def test_implied_vol_invalid_quotes(solver):
+    # above the spot, below intrinsic, nan price, nan spot, infinite strike, expired, vol above 10
+    price = [150.0, 1.0, np.nan, 5.0, 5.0, 5.0, BS_chain(100.0, 100.0, 1.0, 0.0, 12.0).price]
+    S = [100.0, 110.0, 100.0, np.nan, 100.0, 100.0, 100.0]
+    K = [100.0, 100.0, 100.0, 100.0, np.inf, 100.0, 100.0]
+    T = [1.0, 1.0, 1.0, 1.0, 1.0, 0.0, 1.0]
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        vol, status = solver(price, S, K, T, 0.0, 0.0, True, PRECISION, 100)
+    np.testing.assert_array_equal(status, IV_OUT_OF_BOUNDS)
+    assert np.all(np.isnan(vol))
+
+
+@pytest.mark.parametrize('backend', sorted(jit_kernels._BACKENDS))
+def test_implied_vol_public_status(backend):
+    jit_kernels.set_backend(backend)
+    try:
+        vol, status = jit_kernels.implied_vol([10.45, np.nan, 150.0], 100.0, 100.0, 1.0, 0.05)
+    finally:
+        jit_kernels.set_backend('numba' if jit_kernels.NUMBA_AVAILABLE else 'numpy')
+    np.testing.assert_array_equal(status, [IV_CONVERGED, IV_OUT_OF_BOUNDS, IV_OUT_OF_BOUNDS])
+    assert vol[0] == pytest.approx(0.2, abs=1e-4) and np.all(np.isnan(vol[1:]))
+
+
+@pytest.mark.parametrize('loop, numpy_kernel, args', [
+    (jit_kernels._gbm_average_loop, jit_kernels._gbm_average_numpy, (100.0, (0.03 - 0.02) / 50, 0.2 / np.sqrt(50))),
+    (jit_kernels._cir_euler_loop, jit_kernels._cir_euler_numpy, (0.04, 0.2, 0.05, 0.1, 0.25 / 50)),
+])
+def test_path_kernel_parity(loop, numpy_kernel, args):
+    z = np.random.default_rng(1).standard_normal((500, 50))
+    loop_out, numpy_out = np.empty(z.shape[0]), np.empty(z.shape[0])
+    loop(*args, z, loop_out)
+    numpy_kernel(*args, z, numpy_out)
+    np.testing.assert_allclose(loop_out, numpy_out, rtol=PATH_RTOL, atol=0)
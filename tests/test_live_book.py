@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+from quant.black_scholes import BS_chain
+from quant.live_book import LiveBook
+
+N_CONTRACTS, N_UNDERLYINGS = 2000, 20
+
+
+def _stream(resync_every, n_batches=3000):
+    rng = np.random.default_rng(0)
+    spots = rng.uniform(20, 500, N_UNDERLYINGS)
+    names = np.array(['U%02d' % i for i in range(N_UNDERLYINGS)])
+    u = rng.integers(0, N_UNDERLYINGS, N_CONTRACTS)
+    K = spots[u] * rng.uniform(0.7, 1.3, N_CONTRACTS)
+    T = rng.uniform(0.05, 2.0, N_CONTRACTS)
+    sigma = rng.uniform(0.1, 0.5, N_CONTRACTS)
+    is_call = rng.random(N_CONTRACTS) < 0.5
+    quantity = rng.integers(-50, 51, N_CONTRACTS) * 100.0
+    book = LiveBook(names[u], spots[u], K, T, sigma, is_call, quantity, 0.03, 0.01, resync_every=resync_every)
+    for b in range(n_batches):
+        ticked = rng.choice(N_UNDERLYINGS, 3, replace=False)
+        spots[ticked] *= np.exp(0.01 * rng.standard_normal(3))
+        book.tick(names[ticked], spots[ticked])
+        if b % 10 == 0:
+            rows = rng.choice(N_CONTRACTS, 20, replace=False)
+            sigma[rows] = rng.uniform(0.1, 0.5, 20)
+            book.set_vols(rows, sigma[rows])
+        book.update()
+    reference = BS_chain(spots[u], K, T, 0.03, sigma, 0.01, is_call)
+    return book, reference, quantity
+
+
+def _recomputed(book):
+    quantity = book._quantity
+    return np.column_stack([np.bincount(book._underlying_id, weights=g * quantity,
+                                        minlength=book.underlyings.size) for g in book.greeks])
+
+
+def test_incremental_totals_match_full_recomputation():
+    book, reference, quantity = _stream(resync_every=0)
+    for values, expected in zip(book.greeks, reference):
+        np.testing.assert_allclose(values, expected, rtol=1e-9, atol=1e-12)
+    incremental = book.totals.copy()
+    full = _recomputed(book)
+    # the drift of thousands of added changes stays at rounding level relative to the position sizes
+    scale = np.column_stack([np.bincount(book._underlying_id, weights=np.abs(g * quantity),
+                                         minlength=book.underlyings.size) for g in book.greeks])
+    assert np.all(np.abs(incremental - full) <= 1e-9 * (scale + 1))
+    book.recompute_totals()
+    np.testing.assert_array_equal(book.totals, full)
+
+
+def test_periodic_resync():
+    book, reference, quantity = _stream(resync_every=100, n_batches=300)
+    # the last batch was a resync: totals equal the recomputation exactly
+    np.testing.assert_array_equal(book.totals, _recomputed(book))
+    assert book.total().price == pytest.approx(np.sum(reference.price * quantity), rel=1e-9)
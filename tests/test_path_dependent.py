@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+from quant.bsm import BSMAnalytical
+from quant.path_dependent import path_dependent_option_pricing
+
+S0, K, T, r, sigma = 100.0, 100.0, 1.0, 0.05, 0.2
+
+
+@pytest.mark.parametrize('option_type, barrier', [
+    ('down_and_out_call', 110.0), ('down_and_out_put', 100.0),
+    ('up_and_out_call', 90.0), ('up_and_out_put', 100.0),
+])
+def test_knocked_out_at_inception_is_worthless(option_type, barrier):
+    result = path_dependent_option_pricing(S0, K, T, r, sigma, 10000, 12, option_type, barrier,
+                                           rng=np.random.default_rng(0))
+    assert result.price == 0.0
+    assert result.standard_error == 0.0
+
+
+@pytest.mark.parametrize('option_type, barrier', [
+    ('down_and_in_call', 110.0), ('down_and_in_put', 100.0),
+    ('up_and_in_call', 90.0), ('up_and_in_put', 100.0),
+])
+def test_knocked_in_at_inception_is_vanilla(option_type, barrier):
+    result = path_dependent_option_pricing(S0, K, T, r, sigma, 100000, 12, option_type, barrier,
+                                           rng=np.random.default_rng(0))
+    vanilla = BSMAnalytical('C' if option_type.endswith('call') else 'P', S0, K, T, r, sigma)
+    assert abs(result.price - vanilla) < 4 * result.standard_error
+
+
+def test_in_out_parity():
+    # same draws: the in and out prices add up to the vanilla price path by path
+    prices = [path_dependent_option_pricing(S0, K, T, r, sigma, 20000, 50, option_type, 90.0,
+                                            rng=np.random.default_rng(1)).price
+              for option_type in ('down_and_in_call', 'down_and_out_call')]
+    vanilla = path_dependent_option_pricing(S0, K, T, r, sigma, 20000, 50, 'down_and_in_call', 200.0,
+                                            rng=np.random.default_rng(1)).price
+    assert sum(prices) == pytest.approx(vanilla, rel=1e-10)
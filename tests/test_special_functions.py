@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+import math
+import numpy as np
+import pytest
+from scipy.special import ndtr
+from quant import special_functions
+from quant.special_functions import norm_cdf, norm_pdf
+
+# relative error allowed against the references; erfc and ndtr differ by up to ~2.4e-13 in the far lower tail
+MAX_RELATIVE_ERROR = 1e-12
+# both tails up to where the lower tail underflows, and the body on a fine grid
+XS = np.concatenate([np.linspace(-38, -8, 301), np.linspace(-8, 8, 1601), np.linspace(8, 38, 301)])
+
+
+@pytest.fixture(params=['fast', 'scipy'])
+def backend(request):
+    special_functions.set_backend(request.param)
+    yield request.param
+    special_functions.set_backend('fast')
+
+
+def _relative_error(values, reference):
+    # relative error down to the smallest normal double; below it (subnormals, which ndtr
+    # flushes to zero) only the absolute error is meaningful
+    values, reference = np.asarray(values), np.asarray(reference)
+    normal = np.abs(reference) >= np.finfo(float).tiny
+    assert np.all(np.abs(values[~normal] - reference[~normal]) < np.finfo(float).tiny)
+    return np.max(np.abs(values[normal] / reference[normal] - 1))
+
+
+def _erfc_cdf(x):
+    return 0.5 * math.erfc(-x / math.sqrt(2.0))
+
+
+def test_cdf_matches_ndtr(backend):
+    assert _relative_error(norm_cdf(XS), ndtr(XS)) < MAX_RELATIVE_ERROR
+    assert _relative_error([norm_cdf(float(x)) for x in XS], ndtr(XS)) < MAX_RELATIVE_ERROR
+
+
+def test_cdf_matches_erfc(backend):
+    reference = [_erfc_cdf(x) for x in XS]
+    assert _relative_error(norm_cdf(XS), reference) < MAX_RELATIVE_ERROR
+    assert _relative_error([norm_cdf(float(x)) for x in XS], reference) < MAX_RELATIVE_ERROR
+
+
+def test_pdf_matches_formula(backend):
+    reference = [math.exp(-0.5 * x * x) / math.sqrt(2.0 * math.pi) for x in XS]
+    assert _relative_error(norm_pdf(XS), reference) < MAX_RELATIVE_ERROR
+    assert _relative_error([norm_pdf(float(x)) for x in XS], reference) < MAX_RELATIVE_ERROR
+
+
+@pytest.mark.parametrize('function', [norm_cdf, norm_pdf])
+def test_scalar_and_array_agree(backend, function):
+    array = function(XS)
+    for scalar in (XS.tolist(), list(XS), [int(x) for x in XS if x == int(x)]):
+        values = np.array([function(x) for x in scalar])
+        assert _relative_error(values, function(np.asarray(scalar, dtype=float))) < MAX_RELATIVE_ERROR
+    assert array.shape == XS.shape
+
+
+def test_symmetry(backend):
+    x = XS[XS >= 0]
+    np.testing.assert_allclose(norm_cdf(x) + norm_cdf(-x), 1.0, rtol=0, atol=1e-15)
+    np.testing.assert_array_equal(norm_pdf(x), norm_pdf(-x))
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        special_functions.set_backend('nope')
+    assert special_functions.get_backend() == 'fast'
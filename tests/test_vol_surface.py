@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+from quant.black_scholes import BS_chain
+from quant.vol_surface import VolSurface, build_vol_surface, svi_total_variance
+
+K_GRID = np.linspace(-1.0, 1.0, 41)
+
+
+def _assert_calendar_free(surface):
+    # w(k, T) must not decrease across, or just after, any expiry boundary
+    T = np.sort(np.concatenate([surface.expiries, surface.expiries * (1 - 1e-3), surface.expiries * (1 + 1e-3),
+                                np.linspace(0.01, 1.5 * surface.expiries[-1], 200)]))
+    w = surface.total_variance(K_GRID[:, None], T[None, :])
+    assert np.all(np.diff(w, axis=1) >= -1e-15)
+
+
+def test_flat_slices_dipping_below_an_earlier_one():
+    # w(0) = 0.04, 0.02, 0.08: the middle slice is floored at the first, not only at its neighbour
+    params = [(0.04, 0.0, 0.0, 0.0, 0.1), (0.02, 0.0, 0.0, 0.0, 0.1), (0.08, 0.0, 0.0, 0.0, 0.1)]
+    surface = VolSurface([0.5, 1.0, 2.0], params, 100.0, 0.0)
+    _assert_calendar_free(surface)
+    assert surface.total_variance(0.0, 1.0) == pytest.approx(0.04)
+    assert surface.total_variance(0.0, 1.001) == pytest.approx(0.04 + 0.001 * 0.04)
+
+
+def test_random_slices_are_calendar_free():
+    rng = np.random.default_rng(0)
+    params = np.column_stack([rng.uniform(0.0, 0.1, 8), rng.uniform(0.0, 0.3, 8), rng.uniform(-0.9, 0.9, 8),
+                              rng.uniform(-0.2, 0.2, 8), rng.uniform(0.05, 0.4, 8)])
+    _assert_calendar_free(VolSurface(np.linspace(0.1, 3.0, 8), params, 100.0, 0.02))
+
+
+def test_round_trip_from_prices():
+    S, r, q = 100.0, 0.03, 0.01
+    expiries = np.array([0.25, 1.0])
+    true = np.array([[0.006, 0.06, -0.45, 0.05, 0.15], [0.025, 0.1, -0.35, 0.05, 0.25]])
+    T = np.repeat(expiries, 40)
+    K = S * np.exp(np.tile(np.linspace(-0.4, 0.4, 40), 2) * np.sqrt(T))
+    k = np.log(K / (S * np.exp((r - q) * T)))
+    sigma = np.sqrt(svi_total_variance(k, *true[np.searchsorted(expiries, T)].T) / T)
+    prices = BS_chain(S, K, T, r, sigma, q, K > S).price
+    surface = build_vol_surface(prices, S, K, T, r, q, K > S)
+    np.testing.assert_allclose(surface.expiries, expiries)
+    assert np.max(np.abs(surface.vol(K, T) - sigma)) < 1e-3
+    _assert_calendar_free(surface)
+
+
+def test_no_expiry_with_enough_quotes():
+    prices = BS_chain(100.0, [90.0, 100.0, 110.0], 1.0, 0.03, 0.2).price
+    with pytest.raises(ValueError, match='5 converged quotes'):
+        build_vol_surface(prices, 100.0, [90.0, 100.0, 110.0], 1.0, 0.03)
+    # quotes that all fail to invert leave nothing to fit either
+    with pytest.raises(ValueError, match='converged quotes'):
+        build_vol_surface(np.full(10, 150.0), 100.0, np.linspace(80, 120, 10), 1.0, 0.03)
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+from quant.NSS import SV
+from quant.yield_curve import TermStructure
+
+BETAS, DECAY = (0.04, -0.02, 0.01, 0.015), (1.5, 9.0)
+
+
+@pytest.fixture(scope='module')
+def curve():
+    return TermStructure('SV', BETAS, DECAY, t_max=10.0)
+
+
+def test_zero_rates_match_svensson(curve):
+    T = np.linspace(0.01, 10.0, 1001)
+    assert np.max(np.abs(curve.zero_rate(T) - SV(*BETAS, *DECAY, T)[0])) < 1e-5
+
+
+def test_short_end(curve):
+    assert curve.zero_rate(0.0) == pytest.approx(BETAS[0] + BETAS[1])
+    assert curve.discount_factor(0.0) == 1.0
+
+
+@pytest.mark.parametrize('T', [10.0 + 1e-3, 12.0, 20.0, 45.0])
+def test_extrapolated_forward_is_the_derivative_of_the_integrated_forward(curve, T):
+    h = 1e-4
+    derivative = (curve.integrated_forward(T + h) - curve.integrated_forward(T - h)) / (2 * h)
+    assert curve.forward_rate(T) == pytest.approx(derivative, rel=1e-9)
+    # held flat at the forward of t_max
+    assert curve.forward_rate(T) == curve.forward_rate(10.0)
+
+
+@pytest.mark.parametrize('method', ['integrated_forward', 'discount_factor', 'zero_rate', 'forward_rate'])
+@pytest.mark.parametrize('T', [-1e-9, -0.5, [1.0, -2.0], np.nan])
+def test_negative_expiries_are_rejected(curve, method, T):
+    # a negative grid index would otherwise read the long end of the curve
+    with pytest.raises(ValueError, match='non-negative'):
+        getattr(curve, method)(T)